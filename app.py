@@ -1,43 +1,175 @@
-from flask import Flask, render_template, request, jsonify
-from pymongo.mongo_client import MongoClient
-import certifi
+from flask import Flask, Response, g, render_template, request, jsonify, url_for, send_from_directory
 from weather_service import WeatherService
 from data_service import DataService
 from background_scheduler import BackgroundScheduler
-import random
-import base64
-import hmac
-import hashlib
+from cache_service import CacheService
+from event_bus import EventBus
+from job_queue import JobQueue
+from recommendation_engine import RecommendationEngine, ITEM_TYPES
+from recommendation_sessions import create_recommendation_sessions
+from data_version import DataVersion
+from response_cache import ResponseCache
+from map_assets import MapManifest
+from http_client import get_http_client
+from location_service import LocationService
+from index_registry import ensure_indexes
+from vote_history import bucket_hour, to_utc
+from mongo_connection import (get_mongo_connection, MAX_STALENESS_SECONDS,
+                              request_primary_reads, reset_read_routing)
+import datetime
+import threading
 import time
-import json
-from urllib.parse import urlencode
-import requests
+import uuid
 
 from dotenv import load_dotenv
 import os
 load_dotenv()
 
-# MongoDB 연결
-uri = os.getenv('MONGODB_URI')
+# MongoDB 연결 (앱/스케줄러/추천 기능이 연결 풀 하나를 공유)
 app = Flask(__name__)
-client = MongoClient(uri, tlsCAFile=certifi.where())
+mongo_connection = get_mongo_connection()
+client = mongo_connection.client
+
+# 서비스 초기화 (조회 캐시/랭킹 색인/변경 알림은 투표/온도 갱신 시 함께 반영되도록 공유)
+# 투표/온도 저장마다 데이터 세대 번호를 올려 조회 API 응답의 ETag를 바꿈
+data_version = DataVersion(client.korea_regions_db.system_info)
+cache_service = CacheService(version=data_version)
+response_cache = ResponseCache(data_version, app.json.dumps)
+event_bus = EventBus()
+data_service = DataService(client, cache_service, events=event_bus)
+weather_service = WeatherService(client, cache_service, data_service.ranking, event_bus)
+scheduler = BackgroundScheduler(cache_service, data_service.ranking, event_bus, client)
+
+# 빌드된 지도 TopoJSON (python manage.py map build) - 파일 이름에 내용 해시가 있으므로 오래 캐시
+MAP_ASSET_DIR = os.path.join(app.static_folder, 'map')
+MAP_ASSET_MAX_AGE = 365 * 24 * 3600
+map_manifest = MapManifest(MAP_ASSET_DIR)
+
+# 외부 API 호출용 공유 연결 풀 (기상청, 네이버 위치 조회)
+http_client = get_http_client()
+location_service = LocationService(http=http_client)
+
+# 수동 온도 갱신 작업 큐 (요청은 작업 id만 받고 바로 반환)
+job_queue = JobQueue(client.korea_regions_db)
+
+def run_temperature_update():
+    updated_count = weather_service.update_temperature_data_smart()
+    if updated_count == 0:
+        return {
+            "updated_count": 0,
+            "message": "온도 데이터가 최근에 업데이트되었거나 업데이트 중이어서 스킵되었습니다."
+        }
+    return {
+        "updated_count": updated_count,
+        "message": f"{updated_count}개 지역 온도 데이터 업데이트 완료"
+    }
+
+def run_region_temperature_update(province, region):
+    updated_count = weather_service.update_temperature_data_by_region(province, region)
+    return {
+        "updated_count": updated_count,
+        "message": f"{updated_count}개 지역 온도 데이터 업데이트 완료"
+    }
+
+job_queue.register('temperature_update', run_temperature_update)
+job_queue.register('region_temperature_update', run_region_temperature_update)
 
-# 서비스 초기화
-weather_service = WeatherService(client)
-data_service = DataService(client)
-scheduler = BackgroundScheduler()
+def job_accepted(job_id):
+    """작업 등록 응답 (202 + 상태 조회 주소)"""
+    return jsonify({
+        "status": "queued",
+        "job_id": job_id,
+        "status_url": url_for('get_job', job_id=job_id)
+    }), 202
 
 # 추천 DB 연결 (기존 client 사용)
 recommend_db = client["AdditionalFeature"]
 recommend_collection = recommend_db["recommendations"]
-
-# ===== 추천 기능 관련 전역 변수 =====
-shown_this_round_clothes = set()
-shown_this_round_food = set()
+# 추천 항목 가중치는 메모리에서 관리, 좋아요/노출 수는 모아서 저장
+# 이번 라운드에 보여준 항목은 사용자(세션)별로 기록
+recommendation_sessions = create_recommendation_sessions(recommend_db)
+recommendation_engine = RecommendationEngine(recommend_collection, recommendation_sessions)
+RECOMMEND_SESSION_COOKIE = 'recommend_session'
+
+# 투표한 클라이언트는 세컨더리 지연 허용 시간 동안 프라이머리에서 읽음 (방금 한 투표가 바로 보이도록)
+READ_PRIMARY_COOKIE = 'read_primary_until'
+
+def _parse_time(value):
+    """ISO 8601 시각 -> UTC 시각 (투표 버킷과 같은 기준, 시간대가 없으면 서버 지역 시각으로 간주)"""
+    if not value:
+        return None
+    return to_utc(datetime.datetime.fromisoformat(value))
+
+def parse_time_window(args):
+    """요청 인자에서 시간 범위 (start, end) 추출, 잘못된 값이면 ValueError
+
+    - hours=N: 현재 시간 버킷을 포함한 최근 N시간 (N >= 1)
+    - start/end: ISO 8601 시각 (end는 미포함)
+    """
+    if args.get('hours'):
+        hours = int(args['hours'])
+        if hours < 1:
+            raise ValueError("hours는 1 이상이어야 합니다")
+        return bucket_hour() - datetime.timedelta(hours=hours - 1), None
+
+    return _parse_time(args.get('start')), _parse_time(args.get('end'))
+
+@app.before_request
+def route_reads():
+    """방금 투표한 클라이언트의 요청이면 읽기 전용 조회도 프라이머리로"""
+    until = request.cookies.get(READ_PRIMARY_COOKIE, type=float)
+    if until and until > time.time():
+        g.read_routing_token = request_primary_reads()
+
+@app.teardown_request
+def reset_reads(exc):
+    token = g.pop('read_routing_token', None)
+    if token is not None:
+        reset_read_routing(token)
+
+def cached_json(endpoint, args, loader):
+    """직렬화 결과를 캐시해서 응답 (If-None-Match가 같으면 304, 가능하면 압축본)
+
+    Cache-Control: no-cache라서 브라우저는 매번 ETag로 확인하고 바뀐 경우만 본문을 받음
+    """
+    payload = response_cache.get(endpoint, args, loader)
+    if request.if_none_match.contains_weak(payload.etag):
+        response = Response(status=304)
+    else:
+        encoding = response_cache.choose_encoding(payload, request.accept_encodings)
+        body = payload.encoded(encoding) if encoding else payload.body
+        response = Response(body, mimetype='application/json')
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+    # 압축 여부와 관계없이 같은 내용이므로 약한 ETag
+    response.set_etag(payload.etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+def read_own_writes(response):
+    """투표 응답에 프라이머리 읽기 쿠키 설정 (세컨더리 최대 지연 시간 동안 유지)"""
+    response.set_cookie(READ_PRIMARY_COOKIE, str(time.time() + MAX_STALENESS_SECONDS),
+                        max_age=MAX_STALENESS_SECONDS, httponly=True, samesite='Lax')
+    return response
 
 @app.route("/")
 def home():
-    return render_template('index.html')
+    return render_template('index.html', map_assets=map_manifest.get())
+
+@app.route('/map/<filename>')
+def map_asset(filename):
+    """빌드된 지도 파일 (받을 수 있으면 미리 압축한 br/gzip 파일로)"""
+    encoding = next((encoding for encoding, ext in (('br', '.br'), ('gzip', '.gz'))
+                     if encoding in request.accept_encodings
+                     and os.path.isfile(os.path.join(MAP_ASSET_DIR, filename + ext))), None)
+    path = filename + {'br': '.br', 'gzip': '.gz'}.get(encoding, '')
+    response = send_from_directory(MAP_ASSET_DIR, path, mimetype='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Cache-Control'] = f'public, max-age={MAP_ASSET_MAX_AGE}, immutable'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
 
 @app.route('/get_data')    
 def get_data():
@@ -52,20 +184,39 @@ def result():
     si = request.args.get("si")
     detail = request.args.get("detail")
     
-    data = data_service.save_vote_result(feeling, do, si, detail)
-    return jsonify(data)
+    try:
+        data = data_service.save_vote_result(feeling, do, si, detail)
+    except ValueError:
+        return jsonify({"error": "투표 형식 오류"}), 400
+    return read_own_writes(jsonify(data))
+
+@app.route('/result/batch', methods=['POST'])
+def result_batch():
+    """여러 투표를 한 번에 저장"""
+    votes = (request.json or {}).get("votes", [])
+    saved_count = data_service.save_vote_results(
+        (vote.get("feeling"), vote.get("d0"), vote.get("si"), vote.get("detail"))
+        for vote in votes
+    )
+    return read_own_writes(jsonify({"status": "success", "saved_count": saved_count}))
 
 @app.route('/get_weather_data')
 def get_weather_data():
     level = request.args.get('level', 'provinces')
     province = request.args.get('province')
+    try:
+        start, end = parse_time_window(request.args)
+    except ValueError:
+        return jsonify({"error": "시간 범위 형식 오류"}), 400
     
-    weather_stats, detail_arrays = data_service.get_weather_data(level, province)
-    
-    return jsonify({
-        "weather_stats": weather_stats,
-        "detail_arrays": detail_arrays
-    })
+    def load():
+        weather_stats, detail_arrays = data_service.get_weather_data(level, province, start, end)
+        return {
+            "weather_stats": weather_stats,
+            "detail_arrays": detail_arrays
+        }
+
+    return cached_json('weather', (level, province, start, end), load)
 
 @app.route('/generate_test_data')
 def generate_test_data():
@@ -83,28 +234,26 @@ def get_raw_stats():
 
 @app.route('/update_temperature_data', methods=['POST'])
 def manual_update_temperature():
-    """수동 온도 데이터 업데이트 (캐시 확인)"""
-    try:
-        updated_count = weather_service.update_temperature_data_smart()
-
-        if updated_count == 0:
-            return jsonify({
-                "status": "success",
-                "message": "온도 데이터가 최근에 업데이트되어 스킵되었습니다.",
-                "updated_count": 0
-            })
-        
-        return jsonify({
-            "status": "success",
-            "message": f"{updated_count}개 지역 온도 데이터 업데이트 완료",
-            "updated_count": updated_count
-        })
-    
-    except Exception as e:
-        return jsonify({
-            "status": "error",
-            "message": f"온도 데이터 업데이트 실패: {str(e)}"
-        }), 500
+    """수동 온도 데이터 업데이트 작업 등록 (진행 상황은 status_url로 조회)"""
+    return job_accepted(job_queue.enqueue('temperature_update'))
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    """작업 상태 조회 (queued/running/completed/failed)"""
+    job = job_queue.get(job_id)
+    if not job:
+        return jsonify({"error": "작업을 찾을 수 없습니다"}), 404
+
+    return jsonify({
+        "job_id": job["_id"],
+        "type": job["type"],
+        "status": job["status"],
+        "result": job.get("result"),
+        "error": job.get("error"),
+        "created_at": job.get("created_at"),
+        "started_at": job.get("started_at"),
+        "finished_at": job.get("finished_at")
+    })
 
 @app.route('/get_region_info')
 def get_region_info():
@@ -116,86 +265,37 @@ def get_region_info():
 
 @app.route('/update_region_temperature', methods=['POST'])
 def update_region_temperature():
-    """특정 지역 온도 데이터만 업데이트"""
+    """특정 지역 온도 데이터만 업데이트 (작업 큐로 실행)"""
     province = request.json.get('province')
     region = request.json.get('region')
     
-    try:
-        updated_count = weather_service.update_temperature_data_by_region(province, region)
-        return jsonify({
-            "status": "success",
-            "message": f"{updated_count}개 지역 온도 데이터 업데이트 완료"
-        })
-    except Exception as e:
-        return jsonify({
-            "status": "error", 
-            "message": str(e)
-        }), 500
+    return job_accepted(job_queue.enqueue('region_temperature_update', province=province, region=region))
     
 @app.route('/find_province_by_region')
 def find_province_by_region():
     region_name = request.args.get('region')
     
-    for collection_name in data_service.collections:
-        collection = data_service.db[collection_name]
-        if collection.find_one({"name": region_name}):
-            return jsonify({"province": collection_name})
+    province = data_service.find_province(region_name)
+    if province:
+        return jsonify({"province": province})
     
     return jsonify({"error": "지역을 찾을 수 없습니다"}), 404
 
-def make_signature(method, basestring, timestamp, access_key, secret_key):
-    message = f"{method} {basestring}\n{timestamp}\n{access_key}"
-    message = message.encode('utf-8')
-    secret_key = secret_key.encode('utf-8')
-    signature = base64.b64encode(
-        hmac.new(secret_key, message, digestmod=hashlib.sha256).digest()
-    ).decode('utf-8')
-    return signature
-
-def requestApi(timestamp, access_key, signature, uri):
-    headers = {
-        'x-ncp-apigw-timestamp': timestamp,
-        'x-ncp-iam-access-key': access_key,
-        'x-ncp-apigw-signature-v2': signature
-    }
-    res = requests.get(uri, headers=headers)
-    data = json.loads(res.text)
-    return data
-
 @app.route("/get_Location")
 def get_Location():
     IP = request.remote_addr
-    print("Ip = %s" % request.remote_addr)
     
     # # 로컬 개발 환경에서는 테스트용 IP 사용
     # if IP == "127.0.0.1" or IP.startswith("192.168") or IP.startswith("10."):
     #     IP = "8.8.8.8"  # 테스트용 IP
     
-    method = "GET"
-    path = "/geolocation/v2/geoLocation"
-    params = {
-        "ip": IP,
-        "ext": "t",
-        "enc": "utf-8",
-        "responseFormatType": "json"
-    }
-    
-    query = urlencode(params)
-    basestring = f"{path}?{query}"
-    timestamp = str(int(time.time() * 1000))
-    access_key = os.getenv('NAVER_ACCESS_KEY')
-    secret_key = os.getenv('NAVER_SECRET_KEY')
-    
     try:
-        signature = make_signature(method, basestring, timestamp, access_key, secret_key)
-        hostname = "https://geolocation.apigw.ntruss.com"
-        requestUri = f"{hostname}{path}?{query}"
-        response = requestApi(timestamp, access_key, signature, requestUri)
-        print(response)
+        # 같은 IP 대역은 캐시된 결과 사용 (네이버 API 호출 최소화)
+        # 캐시에 없으면 GEO_REQUEST_WAIT_SECONDS까지만 기다리고 조회는 백그라운드에서 계속
+        location = location_service.lookup(IP, wait=location_service.request_wait)
         
-        if 'geoLocation' in response:
-            r1 = response['geoLocation']['r1']  # 광역시/도
-            r2 = response['geoLocation']['r2'].split()[0]  # 시/군/구
+        if location:
+            r1, r2 = location  # 광역시/도, 시/군/구
             return jsonify({"success": True, "province": r1, "city": r2})
         else:
             return jsonify({"success": False, "error": "위치 정보를 찾을 수 없습니다"})
@@ -203,11 +303,66 @@ def get_Location():
         print(f"위치 조회 실패: {e}")
         return jsonify({"success": False, "error": str(e)})
 
+@app.route('/stream')
+def stream():
+    """지도/랭킹 변경 알림 (Server-Sent Events)
+
+    - delta: {"regions": [...], "provinces": [...], "temperatures": [...], "ranking": [...]} 중 바뀐 것만
+    - reset: 놓친 알림이 있으니 전체 다시 조회
+    - 동시 구독자가 SSE_MAX_SUBSCRIBERS명을 넘으면 503 (클라이언트는 SSE_BUSY_RETRY_SECONDS 뒤 다시 연결)
+    """
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    subscription = event_bus.subscribe(last_event_id)
+    if subscription is None:
+        retry = int(os.getenv('SSE_BUSY_RETRY_SECONDS', 30))
+        return Response(f"retry: {retry * 1000}\n\n", status=503, mimetype='text/event-stream',
+                        headers={'Retry-After': str(retry), 'Cache-Control': 'no-cache'})
+
+    heartbeat = float(os.getenv('SSE_HEARTBEAT_SECONDS', 15))
+    return Response(event_bus.stream(subscription, heartbeat), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/get_scheduler_status')
+def get_scheduler_status():
+    """스케줄러 리더와 정기 작업 실행 기록"""
+    return jsonify(scheduler.status())
+
+@app.route('/get_stream_stats')
+def get_stream_stats():
+    """변경 알림 구독자/대기 통계"""
+    return jsonify(event_bus.stats())
+
+@app.route('/get_cache_stats')
+def get_cache_stats():
+    """조회 캐시 적중/미스 통계"""
+    return jsonify(cache_service.stats())
+
+@app.route('/get_location_cache_stats')
+def get_location_cache_stats():
+    """위치 조회 캐시 적중/미스 통계"""
+    return jsonify(location_service.stats())
+
+@app.route('/get_db_pool_stats')
+def get_db_pool_stats():
+    """MongoDB 연결 풀 설정과 서버별 사용량"""
+    return jsonify(mongo_connection.stats())
+
+@app.route('/get_http_stats')
+def get_http_stats():
+    """외부 API 호스트별 지연/오류 통계"""
+    return jsonify(http_client.stats())
+
 @app.route('/get_ranking_data')
 def get_ranking_data():
     """DB에 저장된 데이터로 랭킹 계산"""
-    ranking_data = data_service.get_ranking_data()
-    return jsonify(ranking_data)
+    try:
+        start, end = parse_time_window(request.args)
+    except ValueError:
+        return jsonify({"error": "시간 범위 형식 오류"}), 400
+
+    return cached_json('ranking', (start, end), lambda: data_service.get_ranking_data(start, end))
 
 @app.route('/quiz_result')
 def quiz_result():
@@ -215,8 +370,11 @@ def quiz_result():
     si = request.args.get("si")
     
     try:
-        collection = data_service.db[d0]
-        region_doc = collection.find_one({"name": si})
+        province = data_service.resolve_province(d0, si)
+        if not province:
+            return jsonify(None)
+
+        region_doc = data_service.store.find_one(province, si, {"temperature": 1})
         
         if region_doc and 'temperature' in region_doc:
             temp = region_doc['temperature']
@@ -229,37 +387,43 @@ def quiz_result():
 
 @app.route('/api/recommendations/<feeling>')
 def get_recommendation(feeling):
-    feeling_id = f"{feeling}_추천"
-    rec = recommend_collection.find_one({"_id": feeling_id})
-    if not rec:
+    # 아직 저장 전인 좋아요/노출 수까지 반영된 목록
+    if not recommendation_engine.exists(feeling):
         return jsonify({"error": "데이터 없음"}), 404
 
     # 전체 리스트를 반환하여 클라이언트에서 처리하도록 변경
-    return jsonify({
-        "clothes": rec.get("clothes", []),
-        "food": rec.get("food", [])
-    })
+    # (좋아요는 메모리에 먼저 반영되므로 데이터 세대 번호 대신 추천 목록 번호로 캐시)
+    return cached_json('recommendations', (feeling, recommendation_engine.generation(feeling)),
+                       lambda: recommendation_engine.items(feeling))
+
+@app.route('/api/recommend/<feeling>')
+def recommend_next(feeling):
+    """옷/음식 하나씩 추천 (세션별로 이번 라운드에 본 항목 제외, 다 봤으면 null)
+
+    new_round=1이면 보여준 항목을 초기화하고 새 라운드 시작
+    """
+    if not recommendation_engine.exists(feeling):
+        return jsonify({"error": "데이터 없음"}), 404
+
+    session_id = request.cookies.get(RECOMMEND_SESSION_COOKIE) or uuid.uuid4().hex
+    if request.args.get('new_round') == '1':
+        recommendation_sessions.reset(session_id, feeling, ITEM_TYPES)
+
+    response = jsonify({item_type: recommend_from_list(feeling, item_type, session_id)
+                        for item_type in ITEM_TYPES})
+    response.set_cookie(RECOMMEND_SESSION_COOKIE, session_id,
+                        max_age=int(recommendation_sessions.ttl), httponly=True, samesite='Lax')
+    return response
 
 @app.route('/api/like', methods=['POST'])
 def add_like():
     try:
         data = request.json
-        feeling_id = data['feeling'] + "_추천"
-
-        if data["type"] == "clothes":
-            result = recommend_collection.update_one(
-                {"_id": feeling_id, "clothes.name": data["clothes_name"]},
-                {"$inc": {"clothes.$.likes": 1}}
-            )
-        elif data["type"] == "food":
-            result = recommend_collection.update_one(
-                {"_id": feeling_id, "food.name": data["food_name"]},
-                {"$inc": {"food.$.likes": 1}}
-            )
-        else:
+        if data["type"] not in ("clothes", "food"):
             return jsonify({"error": "타입 오류"}), 400
 
-        if result.modified_count == 0:
+        # 메모리에 모았다가 감정 문서당 $inc 한 번으로 저장 (같은 문서에 좋아요가 몰려도 대기하지 않음)
+        if not recommendation_engine.add_like(data['feeling'], data["type"], data[f"{data['type']}_name"]):
             return jsonify({"error": "업데이트 실패"}), 400
 
         return jsonify({"success": True})
@@ -268,44 +432,47 @@ def add_like():
         return jsonify({"error": "서버 오류"}), 500
 
 # ===== 추천 로직 함수 =====
-def recommend_from_list(items, shown_this_round, debug=False):
-    if not items:
-        return None
-
-    if len(shown_this_round) >= len(items):
-        return None
+def recommend_from_list(feeling, item_type, session_id):
+    """feeling 추천 문서의 item_type(clothes/food) 중 세션이 이번 라운드에 안 본 항목 하나"""
+    return recommendation_engine.recommend(feeling, item_type, session_id)
+
+# ===== 프로세스 시작 작업 =====
+_background_lock = threading.Lock()
+_background_pid = None
+
+def start_background_services():
+    """필수 인덱스 확인, 시군구 색인, 백그라운드 스케줄러 시작 (프로세스마다 한 번)
+
+    WSGI 워커마다 실행되어도 정기 작업은 리더 잠금을 가진 한 곳에서만 실행
+    fork 전에 시작한 스레드는 워커에 없으므로 프로세스 id로 구분 (gunicorn --preload 등)
+    """
+    global _background_pid
+    with _background_lock:
+        if _background_pid == os.getpid():
+            return
+        _background_pid = os.getpid()
 
-    candidates = [x for x in items if x["name"] not in shown_this_round]
-    if not candidates:
-        candidates = items
-
-    if random.random() < 0.9:
-        weights = [(x.get("likes",0)+1) / (x.get("shown_count",0)+1) for x in candidates]
-        total = sum(weights)
-        
-        r = random.uniform(0, total)
-        upto = 0
-        chosen = candidates[0]
-        for item, w in zip(candidates, weights):
-            if upto + w >= r:
-                chosen = item
-                break
-            upto += w
-    else:
-        chosen = random.choice(candidates)
-
-    shown_this_round.add(chosen["name"])
+    try:
+        # 필수 인덱스 확인 (없으면 생성)
+        for label, name, status in ensure_indexes(client):
+            if status != "exists":
+                print(f"인덱스 {label} {name}: {status}")
+        data_service.load_region_index() # 시군구 -> 광역시/도 색인
+        scheduler.start_scheduler() # 백그라운드 스케줄러
+    except Exception as e:
+        # 다음 요청 때 다시 시도
+        print(f"시작 작업 실패: {e}")
+        with _background_lock:
+            _background_pid = None
 
-    # shown_count 증가
-    recommend_collection.update_one(
-        {"$or": [{"clothes.name": chosen["name"]}, {"food.name": chosen["name"]}]},
-        {"$inc": {"clothes.$[elem].shown_count": 1, "food.$[elem].shown_count": 1}},
-        array_filters=[{"elem.name": chosen["name"]}]
-    )
+@app.before_request
+def ensure_background_services():
+    start_background_services()
 
-    return chosen
+# WSGI 서버가 앱을 불러올 때 바로 시작 (요청이 없어도 정기 작업이 돌도록)
+start_background_services()
 
 if __name__ == '__main__':
-    scheduler.start_scheduler() # 백그라운드 스케줄러
     print("서버가 시작됩니다...")
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # 요청마다 스레드 사용 (SSE 연결/느린 요청이 다른 투표 요청을 막지 않도록)
+    app.run(debug=True, host='0.0.0.0', port=5000, threaded=True)
\ No newline at end of file
@@ -199,15 +199,17 @@ data = {'강원도': [{'code': 90, 'name': '속초시'},
            {'code': 604, 'name': '옥천군'},
            {'code': 619, 'name': '음성군'},
            {'code': 623, 'name': '증평군'}]}
+# 모든 시군구를 regions 컬렉션 하나에 저장 (province 필드로 광역시/도 구분)
+collection = db["regions"]
+collection.create_index([("province", 1), ("name", 1)], name="province_name")
+collection.create_index([("code", 1)], name="code")
+
+# 기존 데이터 삭제 (중복 방지)
+# collection.delete_many({})
+
 for province, regions in data.items():
-    # 컬렉션 이름 = 광역시/도 이름
-    collection = db[province]
-    
-    # 기존 데이터 삭제 (중복 방지)
-    # collection.delete_many({})
-    
     # 각 지역을 하나씩 문서로 삽입
     for region in regions:
-        collection.insert_one({**region, 'hot': [0,0,0,0,0,0], 'normal': [0,0,0,0,0,0], 'cold': [0,0,0,0,0,0]})
+        collection.insert_one({**region, 'province': province, 'hot': [0,0,0,0,0,0], 'normal': [0,0,0,0,0,0], 'cold': [0,0,0,0,0,0]})
 
-print("모든 광역시/도별 컬렉션에 데이터 삽입 완료!")
\ No newline at end of file
+print("regions 컬렉션에 모든 광역시/도 데이터 삽입 완료!")
\ No newline at end of file
@@ -0,0 +1,109 @@
+import argparse
+from data_service import DataService
+from index_registry import ensure_indexes, index_report
+from mongo_connection import get_mongo_client
+from map_assets import build_map_assets
+
+from dotenv import load_dotenv
+import os
+load_dotenv()
+
+# 운영용 관리 명령어 모음
+# 사용 예) python manage.py rollup check
+
+
+def get_client():
+    return get_mongo_client()
+
+
+def rollup_command(args):
+    """광역시/도 누적 투표 문서 점검 및 재작성"""
+    data_service = DataService(get_client())
+
+    if args.action == 'rebuild':
+        count = data_service.rebuild_rollup(args.province)
+        print(f"{count}개 광역시/도 누적 투표 문서 재작성 완료")
+    else:
+        drifted = data_service.reconcile_rollup(args.province, fix=(args.action == 'reconcile'))
+        if not drifted:
+            print("누적 투표 문서가 시군구 데이터와 일치합니다")
+        elif args.action == 'reconcile':
+            print(f"어긋난 누적 문서 {len(drifted)}개 수정 완료: {', '.join(drifted)}")
+        else:
+            print(f"어긋난 누적 문서 {len(drifted)}개: {', '.join(drifted)}")
+
+
+def migrate_regions_command(args):
+    """광역시/도별 컬렉션 -> regions 컬렉션 이전"""
+    data_service = DataService(get_client())
+    store = data_service.store
+
+    legacy = store.legacy_collections()
+    if not legacy:
+        print("이전할 광역시/도별 컬렉션이 없습니다")
+        return
+
+    migrated = store.migrate_from_legacy(overwrite=args.overwrite, drop_legacy=args.drop_legacy)
+    for province, count in migrated.items():
+        print(f"{province}: {count}개 시군구 이전")
+
+    # 새 구조 기준으로 누적 투표 문서 다시 계산
+    data_service.rebuild_rollup()
+    print(f"총 {sum(migrated.values())}개 시군구 이전 완료")
+
+
+def indexes_command(args):
+    """선언된 인덱스 생성 또는 누락/미사용 인덱스 보고"""
+    client = get_client()
+
+    if args.action == 'ensure':
+        for label, name, status in ensure_indexes(client):
+            print(f"{label} {name}: {status}")
+        return
+
+    for label, result in index_report(client).items():
+        print(label)
+        print(f"  누락: {', '.join(result['missing']) or '-'}")
+        print(f"  미사용: {', '.join(result['unused']) or '-'}")
+        print(f"  미선언: {', '.join(result['undeclared']) or '-'}")
+
+
+def map_command(args):
+    """원본 GeoJSON -> 해상도별 TopoJSON + 압축본 생성"""
+    manifest, sizes = build_map_assets(args.source, args.output)
+    for layer, resolutions in manifest.items():
+        for resolution, filename in resolutions.items():
+            print(f"{layer} {resolution}: {filename} ({sizes[filename] / 1024:.1f}KB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="오늘 따라 관리 명령어")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    rollup_parser = subparsers.add_parser('rollup', help="광역시/도 누적 투표 문서 관리")
+    rollup_parser.add_argument('action', choices=['check', 'reconcile', 'rebuild'])
+    rollup_parser.add_argument('--province', help="특정 광역시/도만 처리")
+    rollup_parser.set_defaults(func=rollup_command)
+
+    migrate_parser = subparsers.add_parser('migrate-regions', help="광역시/도별 컬렉션을 regions 컬렉션으로 이전")
+    migrate_parser.add_argument('--overwrite', action='store_true', help="이미 이전된 문서도 이전 컬렉션 내용으로 덮어쓰기")
+    migrate_parser.add_argument('--drop-legacy', action='store_true', help="이전 후 광역시/도별 컬렉션 삭제")
+    migrate_parser.set_defaults(func=migrate_regions_command)
+
+    indexes_parser = subparsers.add_parser('indexes', help="인덱스 생성/점검")
+    indexes_parser.add_argument('action', choices=['ensure', 'report'])
+    indexes_parser.set_defaults(func=indexes_command)
+
+    static_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+    map_parser = subparsers.add_parser('map', help="지도 TopoJSON 파일 생성")
+    map_parser.add_argument('action', choices=['build'])
+    map_parser.add_argument('--source', default=os.path.join(static_dir, 'data'), help="원본 GeoJSON 폴더")
+    map_parser.add_argument('--output', default=os.path.join(static_dir, 'map'), help="생성 파일 폴더")
+    map_parser.set_defaults(func=map_command)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,52 +1,141 @@
-import schedule
+import datetime
 import time
 import threading
+from pymongo import ReturnDocument
 from weather_service import WeatherService
-from pymongo.mongo_client import MongoClient
-import certifi
+from mongo_lease import MongoLease
+from mongo_connection import get_mongo_client
 
 from dotenv import load_dotenv
 import os
 load_dotenv()
 
 class BackgroundScheduler:
-    def __init__(self):
-        uri = os.getenv('MONGODB_URI')
-        self.client = MongoClient(uri, tlsCAFile=certifi.where())
-        self.weather_service = WeatherService(self.client)
-        
+    """여러 프로세스/서버 중 리더 한 곳에서만 정기 작업을 실행하는 스케줄러
+
+    - leases 컬렉션의 scheduler_leader 잠금을 가진 프로세스가 리더
+      (SCHEDULER_LEASE_SECONDS/3마다 연장, 리더가 죽으면 만료 후 다른 프로세스가 넘겨받음)
+    - 작업별 다음 실행 시각은 scheduler_jobs 컬렉션에 저장 (재시작해도 일정 유지)
+    - 실행할 작업은 next_run을 조건으로 find_one_and_update해서 가져가므로 한 번만 실행
+    - 마지막 실행 시각/소요 시간/결과는 scheduler_jobs 문서에 기록 (/get_scheduler_status)
+    """
+    def __init__(self, cache=None, ranking=None, events=None, client=None):
+        self.client = client or get_mongo_client()     # 앱과 같은 연결 풀 사용
+        self.db = self.client.korea_regions_db
+        self.weather_service = WeatherService(self.client, cache, ranking, events)
+        self.jobs = self.db.scheduler_jobs
+        self.lease = MongoLease(self.db.leases, "scheduler_leader",
+                                ttl=float(os.getenv('SCHEDULER_LEASE_SECONDS', 60)))
+        self.is_leader = False
+        self._leader_changed = threading.Event()
+        self._handlers = {}     # 작업 이름 -> (실행 함수, 실행 간격(초))
+
     def update_temperature_job(self):
         """백그라운드에서 실행되는 온도 업데이트 작업"""
         print("백그라운드 온도 데이터 업데이트 시작...")
+        # 수동 갱신과 같은 잠금 사용 (동시에 실행되지 않도록), 정기 작업이므로 최근 갱신 여부는 무시
+        updated_count = self.weather_service.update_temperature_data_smart(force=True)
+        print(f"백그라운드 온도 업데이트 완료: {updated_count}개 지역")
+        return updated_count
+
+    def add_job(self, name, func, interval, first_delay=0):
+        """정기 작업 등록 - 처음 등록될 때만 first_delay초 뒤로 첫 실행 예약"""
+        self._handlers[name] = (func, interval)
+        now = datetime.datetime.now()
+        self.jobs.update_one(
+            {"_id": name},
+            {"$set": {"interval_seconds": interval},
+             "$setOnInsert": {"next_run": now + datetime.timedelta(seconds=first_delay)}},
+            upsert=True
+        )
+
+    def _heartbeat(self):
+        """리더 잠금 연장 또는 획득 시도"""
+        interval = self.lease.ttl / 3
+        while True:
+            try:
+                was_leader = self.is_leader
+                self.is_leader = self.lease.renew() if was_leader else self.lease.acquire()
+                if self.is_leader != was_leader:
+                    print(f"스케줄러 리더 {'획득' if self.is_leader else '상실'}: {self.lease.owner}")
+                    self._leader_changed.set()
+            except Exception as e:
+                print(f"스케줄러 리더 잠금 확인 실패: {e}")
+                self.is_leader = False
+            time.sleep(interval)
+
+    def _claim_due_job(self, now):
+        """실행 시각이 된 작업 하나를 가져가고 다음 실행 시각을 미리 기록"""
+        for name, (func, interval) in self._handlers.items():
+            job = self.jobs.find_one_and_update(
+                {"_id": name, "next_run": {"$lte": now}},
+                {"$set": {"next_run": now + datetime.timedelta(seconds=interval),
+                          "last_run": now, "last_owner": self.lease.owner, "last_status": "running"}},
+                return_document=ReturnDocument.AFTER
+            )
+            if job:
+                return name, func
+        return None
+
+    def _run_job(self, name, func):
+        started = time.monotonic()
         try:
-            updated_count = self.weather_service.update_temperature_data()
-            print(f"백그라운드 온도 업데이트 완료: {updated_count}개 지역")
+            result = func()
+            update = {"last_status": "completed", "last_result": result, "last_error": None}
         except Exception as e:
-            print(f"백그라운드 온도 업데이트 실패: {e}")
-    
+            print(f"정기 작업 실패 - {name}: {e}")
+            update = {"last_status": "failed", "last_error": str(e)}
+        update["last_duration"] = round(time.monotonic() - started, 3)
+        self.jobs.update_one({"_id": name}, {"$set": update})
+
+    def _seconds_until_next_run(self, now):
+        upcoming = self.jobs.find_one(
+            {"_id": {"$in": list(self._handlers)}}, {"next_run": 1}, sort=[("next_run", 1)]
+        )
+        if not upcoming:
+            return None
+        return max((upcoming["next_run"] - now).total_seconds(), 0)
+
+    def _run_loop(self):
+        """리더일 때만 다음 실행 시각까지 기다렸다가 작업 실행"""
+        max_wait = self.lease.ttl / 3
+        while True:
+            if not self.is_leader:
+                self._leader_changed.wait(max_wait)
+                self._leader_changed.clear()
+                continue
+
+            try:
+                now = datetime.datetime.now()
+                claimed = self._claim_due_job(now)
+                if claimed:
+                    self._run_job(*claimed)
+                    continue
+                wait = self._seconds_until_next_run(now)
+            except Exception as e:
+                print(f"스케줄러 실행 실패: {e}")
+                wait = None
+
+            # 다음 실행 시각까지 대기 (리더 상태 확인을 위해 최대 max_wait)
+            self._leader_changed.wait(max_wait if wait is None else min(wait, max_wait))
+            self._leader_changed.clear()
+
+    def status(self):
+        """리더 잠금과 작업별 실행 기록"""
+        return {
+            "leader": self.lease.holder(),
+            "is_leader": self.is_leader,
+            "owner": self.lease.owner,
+            "jobs": list(self.jobs.find({"_id": {"$in": list(self._handlers)}}))
+        }
+
     def start_scheduler(self):
         """스케줄러 시작"""
-        # 30분마다 온도 데이터 업데이트
-        schedule.every(30).minutes.do(self.update_temperature_job)
-        
-        # 첫 실행 (서버 시작 5분 후)
-        schedule.every().minute.do(self.update_temperature_job).tag('first_run')
-        
-        def run_scheduler():
-            first_run_done = False
-            while True:
-                schedule.run_pending()
-                
-                # 첫 실행 후 태그 제거
-                if not first_run_done and schedule.get_jobs('first_run'):
-                    if any(job.last_run for job in schedule.get_jobs('first_run')):
-                        schedule.clear('first_run')
-                        first_run_done = True
-                        print("첫 실행 완료, 정기 스케줄로 전환")
-                
-                time.sleep(60)  # 1분마다 체크
-        
+        # 30분마다 온도 데이터 업데이트 (처음 등록 시 서버 시작 1분 후 첫 실행)
+        self.add_job("update_temperature", self.update_temperature_job,
+                     interval=float(os.getenv('TEMP_UPDATE_INTERVAL_SECONDS', 1800)), first_delay=60)
+
         # 백그라운드 스레드로 실행
-        scheduler_thread = threading.Thread(target=run_scheduler, daemon=True)
-        scheduler_thread.start()
-        print("백그라운드 온도 업데이트 스케줄러 시작됨 (30분 간격)")
\ No newline at end of file
+        threading.Thread(target=self._heartbeat, daemon=True).start()
+        threading.Thread(target=self._run_loop, daemon=True).start()
+        print("백그라운드 온도 업데이트 스케줄러 시작됨 (30분 간격, 리더 프로세스에서만 실행)")
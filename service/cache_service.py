@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+import os
+load_dotenv()
+
+# 전국 단위 데이터(지도, 랭킹)에 붙는 태그 - 어느 광역시/도가 바뀌어도 무효화
+ALL_PROVINCES = '*'
+
+
+class TTLCache:
+    """TTL 만료 + LRU 제거 방식의 스레드 안전 캐시"""
+    def __init__(self, max_size=512, ttl=30):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (value, 만료 시각, 태그)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """(존재 여부, 값) 반환 - 만료된 항목은 제거"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            value, expires_at, _ = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def set(self, key, value, tags=(), ttl=None):
+        """값 저장 - 용량 초과 시 가장 오래 사용되지 않은 항목부터 제거"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires_at, frozenset(tags))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_tags(self, tags):
+        """지정한 태그 중 하나라도 붙은 항목 제거, 제거된 개수 반환"""
+        tags = set(tags)
+        with self._lock:
+            keys = [key for key, (_, _, entry_tags) in self._entries.items() if entry_tags & tags]
+            for key in keys:
+                del self._entries[key]
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
+
+
+class CacheService:
+    """DataService 조회 결과 캐시 (엔드포인트 + 인자 단위, 광역시/도 태그로 무효화)
+
+    version(DataVersion)을 주면 무효화할 때마다 데이터 세대 번호도 올림
+    (투표/온도 저장은 모두 캐시 무효화를 거치므로 응답 ETag가 함께 바뀜)
+    """
+    def __init__(self, max_size=None, ttl=None, version=None):
+        self.cache = TTLCache(
+            max_size=max_size or int(os.getenv('CACHE_MAX_SIZE', 512)),
+            ttl=ttl or float(os.getenv('CACHE_TTL_SECONDS', 30))
+        )
+        # 조회 도중 무효화가 일어나면 오래된 결과를 저장하지 않기 위한 세대 번호
+        self._generation = 0
+        self.version = version
+
+    def get_or_load(self, endpoint, args, loader, tags=()):
+        """캐시에 있으면 반환, 없으면 loader 실행 결과를 저장 후 반환"""
+        key = (endpoint, args)
+        found, value = self.cache.get(key)
+        if found:
+            return value
+
+        generation = self._generation
+        value = loader()
+        if generation == self._generation:
+            self.cache.set(key, value, tags)
+        return value
+
+    def invalidate_provinces(self, provinces):
+        """해당 광역시/도 데이터와 전국 단위 데이터 무효화"""
+        return self.invalidate_tags(set(provinces) | {ALL_PROVINCES})
+
+    def invalidate_tags(self, tags):
+        self._generation += 1
+        self._bump_version()
+        return self.cache.invalidate_tags(tags)
+
+    def clear(self):
+        self._generation += 1
+        self._bump_version()
+        self.cache.clear()
+
+    def _bump_version(self):
+        if self.version:
+            self.version.bump()
+
+    def stats(self):
+        return self.cache.stats()
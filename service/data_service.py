@@ -1,12 +1,38 @@
 import random
+import datetime
+import logging
+import threading
+import time
+from pymongo import ReplaceOne, UpdateOne, ReturnDocument
+from cache_service import CacheService, ALL_PROVINCES
+from region_store import RegionStore, PROVINCES, FEELINGS, ARRAY_SIZE
+from vote_history import VoteHistory
+from ranking_engine import RankingEngine, TOP_N, COMFORT_TEMP
+from event_bus import EventBus
+from mongo_connection import replica_read_preference, primary_reads_requested, primary_reads
+
+logger = logging.getLogger(__name__)
 
 class DataService:
-    def __init__(self, client):
+    def __init__(self, client, cache=None, ranking=None, events=None):
         self.client = client
         self.db = client.korea_regions_db
-        self.collections = ['서울특별시', '부산광역시', '강원도', '대구광역시', '인천광역시', 
-                           '광주광역시', '대전광역시', '울산광역시', '세종특별자치시', '경기도',
-                           '충청북도', '충청남도', '전라북도', '전라남도', '경상북도', '경상남도', '제주특별자치도']
+        self.store = RegionStore(self.db)       # 시군구 문서 (regions 컬렉션)
+        self.rollup = self.db.province_rollup   # 광역시/도별 누적 투표 문서
+        # 지연을 허용하는 조회(지도/랭킹/통계/시군구 목록)는 세컨더리에서 읽음
+        replica_db = client.get_database(self.db.name, read_preference=replica_read_preference())
+        self.replica_store = RegionStore(replica_db)
+        self.replica_rollup = replica_db.province_rollup
+        self.history = VoteHistory(self.db)     # 시간대별 투표 버킷
+        self.cache = cache or CacheService()    # 조회 결과 캐시 (투표/온도 갱신 시 무효화)
+        self.ranking = ranking or RankingEngine(self.store, version=self.cache.version)    # 전국 랭킹 정렬 색인 (WeatherService와 공유)
+        self.events = events or EventBus()      # /stream 변경 알림 (WeatherService와 공유)
+        # 시군구 투표/온도가 바뀐 묶음마다 순위 다시 계산 (같으면 전송 생략)
+        self.events.derive('ranking', self._ranking_event, ('regions', 'temperatures'))
+        self._region_index = None               # 시군구 이름 -> [광역시/도]
+        self._region_index_loaded_at = 0
+        self._region_index_lock = threading.Lock()
+        self.provinces = PROVINCES
         
     # 계산 함수들
     def _get_feeling_arrays_from_doc(self, doc):
@@ -50,43 +76,361 @@ class DataService:
             'total_votes': total_votes      # 총 투표수
         }
     
-    def _aggregate_province_totals(self, collection):
-        """광역시/도별 총 투표수 집계"""
-        total_hot = total_normal = total_cold = 0
-        region_details = {}
-        
-        for doc in collection.find():
-            processed = self._analyze_region_data(doc)
-            
-            # 광역시/도 총합 누적
-            total_hot += processed['total_votes']['hot']
-            total_normal += processed['total_votes']['normal']
-            total_cold += processed['total_votes']['cold']
-            
-            # 시군구별 상세 데이터 저장 (dominant feeling만)
-            region_name = doc['name']
-            if max(processed['total_votes'].values()) > 0:
-                region_details[region_name] = processed['dominant_array']
-        
+    # 집계 파이프라인 함수들
+    def _region_source_pipeline(self, provinces=None, window=None):
+        """시군구 문서에서 집계에 필요한 필드만 추출하는 시작 스테이지
+
+        window: (start, end) - 지정하면 누적값 대신 해당 시간 범위 버킷 합계 사용
+        """
+        zero = [0] * ARRAY_SIZE
+        pipeline = self.store.source_stages(provinces)
+        if window:
+            pipeline.extend(self.history.window_stages(*window))
+        return pipeline + [{"$project": {
+            "_id": 0,
+            "province": 1,
+            "name": 1,
+            "code": 1,
+            "temperature": 1,
+            "hot": {"$ifNull": ["$hot", zero]},
+            "normal": {"$ifNull": ["$normal", zero]},
+            "cold": {"$ifNull": ["$cold", zero]}
+        }}]
+
+    def _region_feeling_stages(self):
+        """시군구별 투표수와 우세한 feeling 계산 스테이지 (_analyze_region_data와 동일한 규칙)"""
+        return [
+            {"$addFields": {
+                "h": {"$arrayElemAt": ["$hot", 0]},
+                "n": {"$arrayElemAt": ["$normal", 0]},
+                "c": {"$arrayElemAt": ["$cold", 0]}
+            }},
+            {"$addFields": {
+                "dominant": {"$switch": {
+                    "branches": [
+                        {"case": {"$and": [{"$gte": ["$h", "$n"]}, {"$gte": ["$h", "$c"]}]}, "then": "hot"},
+                        {"case": {"$gte": ["$c", "$n"]}, "then": "cold"}
+                    ],
+                    "default": "normal"
+                }}
+            }},
+            {"$addFields": {
+                "votes": {"$add": ["$h", "$n", "$c"]},
+                "dominant_array": {"$switch": {
+                    "branches": [
+                        {"case": {"$eq": ["$dominant", "hot"]}, "then": "$hot"},
+                        {"case": {"$eq": ["$dominant", "cold"]}, "then": "$cold"}
+                    ],
+                    "default": "$normal"
+                }}
+            }}
+        ]
+
+    def _build_weather_pipeline(self, level, window=None):
+        """전국 시군구 문서를 한 번의 aggregate로 집계하는 파이프라인 생성"""
+        pipeline = self._region_source_pipeline(window=window)
+        pipeline.extend(self._region_feeling_stages())
+
+        if level == 'provinces':
+            # 광역시/도 지도에서는 투표가 있는 시군구의 상세 배열만 필요
+            region_stages = [{"$match": {"votes": {"$gt": 0}}}]
+        else:
+            # 서울특별시는 구별로 나누지 않으므로 시군구 목록에서 제외
+            region_stages = [{"$match": {"province": {"$ne": "서울특별시"}}}]
+        region_stages.append({"$project": {"name": 1, "dominant": 1, "votes": 1, "dominant_array": 1}})
+
+        pipeline.append({"$facet": {
+            "totals": [{"$group": {
+                "_id": "$province",
+                "hot": {"$sum": "$h"},
+                "normal": {"$sum": "$n"},
+                "cold": {"$sum": "$c"}
+            }}],
+            "regions": region_stages
+        }})
+        return pipeline
+
+    def _aggregate_weather_data(self, level, window=None):
+        """집계 파이프라인 실행 결과를 (광역시/도 총합, 시군구 목록)으로 반환"""
+        result = next(self._read_store().aggregate(self._build_weather_pipeline(level, window)), None)
+        if not result:
+            return {}, []
+
+        totals = {
+            doc['_id']: {'hot': doc['hot'], 'normal': doc['normal'], 'cold': doc['cold']}
+            for doc in result['totals']
+        }
+        return totals, result['regions']
+
+    def _dominant_feeling_from_totals(self, totals):
+        """광역시/도 총합에서 우세한 feeling 결정 (투표가 없으면 normal)"""
+        max_value = max(totals.values())
+        if max_value > 0:
+            if totals['hot'] == max_value:
+                return 'hot'
+            elif totals['cold'] == max_value:
+                return 'cold'
+        return 'normal'
+
+    # 광역시/도 누적 투표(rollup) 함수들
+    def _build_rollup_pipeline(self, provinces):
+        """시군구 배열을 광역시/도별로 원소 단위 합산하는 파이프라인 생성"""
+        pipeline = self._region_source_pipeline(provinces)
+
+        group = {"_id": "$province"}
+        for feeling in FEELINGS:
+            for i in range(ARRAY_SIZE):
+                group[f"{feeling}{i}"] = {"$sum": {"$arrayElemAt": [f"${feeling}", i]}}
+        pipeline.append({"$group": group})
+        return pipeline
+
+    def _compute_rollups(self, provinces):
+        """시군구 문서로부터 광역시/도별 누적 투표 배열 계산"""
+        rollups = {
+            province: {feeling: [0] * ARRAY_SIZE for feeling in FEELINGS}
+            for province in provinces
+        }
+        for doc in self.store.aggregate(self._build_rollup_pipeline(provinces)):
+            rollups[doc['_id']] = {
+                feeling: [doc[f"{feeling}{i}"] for i in range(ARRAY_SIZE)]
+                for feeling in FEELINGS
+            }
+        return rollups
+
+    def reconcile_rollup(self, province=None, fix=True):
+        """누적 투표 문서를 시군구 문서와 비교해 어긋난 광역시/도 목록 반환 (fix=True면 재작성)"""
+        provinces = [province] if province else self.provinces
+        expected = self._compute_rollups(provinces)
+        stored = {doc['_id']: doc for doc in self.rollup.find({"_id": {"$in": provinces}})}
+
+        drifted = []
+        for name, arrays in expected.items():
+            current = stored.get(name)
+            if not current or any(current.get(feeling) != arrays[feeling] for feeling in FEELINGS):
+                drifted.append(name)
+
+        if fix and drifted:
+            self._write_rollups(drifted)
+        return drifted
+
+    def rebuild_rollup(self, province=None):
+        """누적 투표 문서 전체 재작성"""
+        return self._write_rollups([province] if province else self.provinces)
+
+    def _write_rollups(self, provinces):
+        """지정한 광역시/도의 누적 투표 문서를 시군구 문서 기준으로 재작성"""
+        expected = self._compute_rollups(provinces)
+        now = datetime.datetime.now()
+        self.rollup.bulk_write([
+            ReplaceOne({"_id": name}, {**arrays, "updated_at": now}, upsert=True)
+            for name, arrays in expected.items()
+        ])
+        self.cache.invalidate_provinces(provinces)
+        return len(expected)
+
+    def _create_missing_rollups(self, provinces):
+        """없는 누적 투표 문서만 시군구 문서 기준으로 새로 생성, 생성한 광역시/도 목록 반환
+
+        이미 있는 문서는 건드리지 않음 ($setOnInsert) - 동시에 반영 중인 $inc를 덮어쓰지 않도록
+        """
+        existing = {doc['_id'] for doc in self.rollup.find({"_id": {"$in": list(provinces)}}, {"_id": 1})}
+        missing = [name for name in provinces if name not in existing]
+        if not missing:
+            return []
+
+        now = datetime.datetime.now()
+        result = self.rollup.bulk_write([
+            UpdateOne({"_id": name}, {"$setOnInsert": {**arrays, "updated_at": now}}, upsert=True)
+            for name, arrays in self._compute_rollups(missing).items()
+        ], ordered=False)
+        created = list(result.upserted_ids.values())
+        if created:
+            self.cache.invalidate_provinces(created)
+        return created
+
+    def is_valid_vote(self, feeling, detail):
+        """feeling이 hot/normal/cold이고 detail이 상세 인덱스(1 ~ ARRAY_SIZE-1)인지"""
+        if feeling not in FEELINGS:
+            return False
+        return str(detail).isdigit() and 0 < int(detail) < ARRAY_SIZE
+
+    def _vote_increments(self, feeling, detail, incs=None):
+        """투표 1건에 해당하는 $inc 필드 계산 (총합 인덱스 0 + 상세 인덱스)"""
+        incs = {} if incs is None else incs
+        for path in (f"{feeling}.{0}", f"{feeling}.{detail}"):
+            incs[path] = incs.get(path, 0) + 1
+        return incs
+
+    def _increment_rollup(self, do, feeling, detail):
+        """투표 1건을 광역시/도 누적 문서에 반영"""
+        result = self.rollup.update_one(
+            {"_id": do},
+            {"$inc": self._vote_increments(feeling, detail),
+             "$set": {"updated_at": datetime.datetime.now()}}
+        )
+        # 누적 문서가 아직 없으면 시군구 문서로부터 새로 생성 (이번 투표 포함)
+        if result.matched_count == 0:
+            self._create_missing_rollups([do])
+
+    def _get_rollup_totals(self, provinces):
+        """광역시/도별 총 투표수를 누적 문서에서 조회 (프라이머리에도 없는 문서는 새로 생성)"""
+        docs = {doc['_id']: doc for doc in self._read_rollup().find({"_id": {"$in": provinces}})}
+        missing = [name for name in provinces if name not in docs]
+        if missing:
+            # 세컨더리에만 아직 없는 경우일 수 있으므로 생성 여부는 프라이머리 기준으로 판단
+            self._create_missing_rollups(missing)
+            docs.update({doc['_id']: doc for doc in self.rollup.find({"_id": {"$in": missing}})})
+
         return {
-            'totals': {'hot': total_hot, 'normal': total_normal, 'cold': total_cold},
-            'region_details': region_details
+            name: {feeling: docs[name][feeling][0] for feeling in FEELINGS}
+            for name in provinces
         }
 
+    # 읽기 경로 선택
+    def _read_store(self):
+        """읽기 전용 조회용 저장소 - 보통은 세컨더리, 방금 투표한 요청은 프라이머리"""
+        return self.store if primary_reads_requested() else self.replica_store
+
+    def _read_rollup(self):
+        return self.rollup if primary_reads_requested() else self.replica_rollup
+
+    def _read_args(self, *args):
+        """캐시 키 - 프라이머리에서 읽은 결과와 세컨더리에서 읽은 결과를 따로 보관"""
+        return (*args, primary_reads_requested())
+
+    # 시군구 이름 -> 광역시/도 색인
+    def load_region_index(self):
+        """전체 시군구 이름을 한 번의 조회로 읽어 색인 재구성
+
+        중구/동구/고성군처럼 여러 광역시/도에 같은 이름이 있으므로 이름마다 광역시/도 목록을 유지
+        """
+        index = {}
+        for doc in self.store.find({}, {"_id": 0, "name": 1, "province": 1}):
+            provinces = index.setdefault(doc['name'], [])
+            if doc['province'] not in provinces:
+                provinces.append(doc['province'])
+
+        with self._region_index_lock:
+            self._region_index = index
+            self._region_index_loaded_at = time.monotonic()
+        return len(index)
+
+    def refresh_region_index(self):
+        """시군구 문서가 바뀌었을 때 색인과 시군구 목록 캐시 갱신"""
+        count = self.load_region_index()
+        self.cache.invalidate_tags([f"regions:{province}" for province in self.provinces])
+        return count
+
+    def _provinces_of(self, region_name, province=None):
+        """시군구 이름이 있는 광역시/도 목록 (처음 읽은 문서 순서)"""
+        if self._region_index is None:
+            self.load_region_index()
+
+        provinces = self._region_index.get(region_name, [])
+        missing = not provinces or (province is not None and province not in provinces)
+        if missing and time.monotonic() - self._region_index_loaded_at > 60:
+            # 새로 추가된 시군구일 수 있으므로 1분에 한 번까지만 다시 읽음
+            self.load_region_index()
+            provinces = self._region_index.get(region_name, [])
+        return provinces
+
+    def find_province(self, region_name):
+        """시군구 이름으로 광역시/도 찾기 (O(1)), 없으면 None (같은 이름이 여러 곳이면 처음 읽은 곳)"""
+        provinces = self._provinces_of(region_name)
+        return provinces[0] if provinces else None
+
+    def resolve_province(self, do, si):
+        """요청된 광역시/도와 시군구가 맞는지 확인해 실제 광역시/도 반환 (없는 시군구면 None)
+
+        요청한 광역시/도에 그 시군구가 있으면 그대로 사용하고, 없을 때는 이름이 한 곳에만 있는 경우만 보정
+        """
+        provinces = self._provinces_of(si, do)
+        if do in provinces:
+            return do
+        if len(provinces) != 1:
+            if provinces:
+                logger.warning("광역시/도를 정할 수 없는 시군구: %s %s (후보 %s)", do, si, ", ".join(provinces))
+            return None
+        logger.info("광역시/도 불일치 보정: %s %s -> %s", do, si, provinces[0])
+        return provinces[0]
+
+    # 변경 알림 (/stream)
+    def _region_event(self, province, doc):
+        processed = self._analyze_region_data(doc)
+        return {
+            "province": province,
+            "region": doc['name'],
+            "feeling": processed['dominant_feeling'],
+            "detailArray": processed['dominant_array']
+        }
+
+    def _load_region_event(self, province, name):
+        doc = self.store.find_one(province, name, {"name": 1, "hot": 1, "normal": 1, "cold": 1})
+        return self._region_event(province, doc) if doc else None
+
+    def _province_event(self, province):
+        # 알림은 변경 직후에 계산하므로 세컨더리 지연이 없도록 프라이머리에서 읽음
+        with primary_reads():
+            totals = self._get_rollup_totals([province])[province]
+        return {"province": province, "feeling": self._dominant_feeling_from_totals(totals)}
+
+    def _ranking_event(self):
+        with primary_reads():
+            return self.get_ranking_data()
+
+    def _publish_vote_changes(self, regions):
+        """투표로 바뀐 시군구/광역시도 알림 등록
+
+        regions: {(광역시/도, 시군구): 갱신된 문서 또는 None(전송 시 조회)}
+        """
+        for (do, si), doc in regions.items():
+            if doc:
+                payload = self._region_event(do, doc)
+            else:
+                payload = lambda do=do, si=si: self._load_region_event(do, si)
+            self.events.publish('regions', (do, si), payload)
+
+        for do in {do for do, _ in regions}:
+            self.events.publish('provinces', do, lambda do=do: self._province_event(do))
+
     # 호출 메서드
     def get_regions_by_province(self, province):
         """특정 광역시/도의 시군구 목록 반환"""
-        a = list(self.db[province].find({}, {"_id": 0, "name": 1}))
+        return self.cache.get_or_load(
+            'get_data', self._read_args(province),
+            lambda: self._load_regions_by_province(province),
+            tags=[f"regions:{province}"]
+        )
+
+    def _load_regions_by_province(self, province):
+        a = list(self._read_store().find_by_province(province, {"_id": 0, "name": 1}))
         names = [doc["name"] for doc in a]
         return sorted(names)
 
     def save_vote_result(self, feeling, do, si, detail):
-        """투표 결과 저장 및 선택된 시군구 온도 데이터 반환"""
-        self.db[do].update_one({"name": si}, {"$inc": {f"{feeling}.{0}": 1}})
-        self.db[do].update_one({"name": si}, {'$inc': {f"{feeling}.{detail}": 1}})
+        """투표 결과 저장 및 선택된 시군구 온도 데이터 반환 (feeling/detail이 잘못되면 ValueError)"""
+        if not self.is_valid_vote(feeling, detail):
+            raise ValueError(f"잘못된 투표: feeling={feeling}, detail={detail}")
+
+        # 존재하는 시군구인지 색인으로 먼저 확인
+        do = self.resolve_province(do, si)
+
+        # 총합/상세 증가와 갱신된 문서 조회를 한 번의 요청으로 처리
+        region_doc = None
+        if do:
+            region_doc = self.store.find_one_and_update(
+                do, si,
+                {"$inc": self._vote_increments(feeling, detail)},
+                return_document=ReturnDocument.AFTER
+            )
+        if region_doc:
+            self._increment_rollup(do, feeling, detail)
+            self.history.record(do, si, feeling, detail)
+            self.ranking.update_votes(region_doc)
+            self.cache.invalidate_provinces([do])
+            self._publish_vote_changes({(do, si): region_doc})
 
-        # DB에서 온도 데이터 가져오기 (캐시된 데이터 사용)
-        region_doc = self.db[do].find_one({"name": si})
+        # 온도 데이터는 DB에 캐시된 값 사용
         temp = region_doc.get('temperature', None) if region_doc else None
         
         # 처리된 데이터 가져오기
@@ -106,8 +450,65 @@ class DataService:
             "detailArray": dominant_array
         }
 
-    def get_weather_data(self, level, province=None):
-        """지도 시각화용 날씨 데이터 조회"""
+    def save_vote_results(self, votes):
+        """여러 투표를 한 번에 저장 (bulk_write), 반영된 투표 수 반환
+
+        votes: (feeling, do, si, detail) 튜플 목록
+        """
+        region_incs = {}    # (광역시/도, 시군구) -> $inc
+        rollup_incs = {}    # 광역시/도 -> $inc
+        accepted = []       # (광역시/도, 시군구, feeling, detail) - 시간대별 기록용
+
+        for feeling, do, si, detail in votes:
+            if not self.is_valid_vote(feeling, detail):
+                continue
+            do = self.resolve_province(do, si)
+            if do is None:
+                continue
+            self._vote_increments(feeling, detail, region_incs.setdefault((do, si), {}))
+            self._vote_increments(feeling, detail, rollup_incs.setdefault(do, {}))
+            accepted.append((do, si, feeling, detail))
+
+        if not accepted:
+            return 0
+
+        # 시군구 증가분을 모아서 한 번에 적용
+        matched = self.store.bulk_write([
+            UpdateOne(self.store.region_filter(do, si), {"$inc": incs})
+            for (do, si), incs in region_incs.items()
+        ]).matched_count
+
+        now = datetime.datetime.now()
+        result = self.rollup.bulk_write([
+            UpdateOne({"_id": do}, {"$inc": incs, "$set": {"updated_at": now}})
+            for do, incs in rollup_incs.items()
+        ], ordered=False)
+
+        # 누적 문서가 아직 없는 광역시/도는 시군구 문서로부터 새로 생성 (이번 투표 포함)
+        if result.matched_count < len(rollup_incs):
+            self._create_missing_rollups(list(rollup_incs))
+        # 그 사이 삭제된 시군구가 섞였으면 누적 문서가 어긋났을 수 있음 (manage.py rollup reconcile로 수정)
+        if matched < len(region_incs):
+            print(f"투표 반영 중 없는 시군구 {len(region_incs) - matched}개 - 누적 투표 문서 점검 필요")
+
+        self.history.record_many(accepted)
+        for (do, si), incs in region_incs.items():
+            self.ranking.add_votes(do, si, {feeling: incs.get(f"{feeling}.0", 0) for feeling in FEELINGS})
+
+        self.cache.invalidate_provinces(rollup_incs)
+        self._publish_vote_changes(dict.fromkeys(region_incs))
+
+        return len(accepted)
+
+    def get_weather_data(self, level, province=None, start=None, end=None):
+        """지도 시각화용 날씨 데이터 조회 (start/end를 주면 해당 시간대 투표만 집계)"""
+        return self.cache.get_or_load(
+            'get_weather_data', self._read_args(level, province, start, end),
+            lambda: self._load_weather_data(level, province, start, end),
+            tags=[ALL_PROVINCES]
+        )
+
+    def _load_weather_data(self, level, province=None, start=None, end=None):
         weather_stats = {}
         array = {}
     
@@ -158,59 +559,37 @@ class DataService:
         
             return merged_weather, merged_arrays
     
+        empty_totals = {'hot': 0, 'normal': 0, 'cold': 0}
+        window = (start, end) if start or end else None
+        province_totals, regions = self._aggregate_weather_data(level, window)
+
         if level == 'provinces':
-            for collection_name in self.collections:
-                collection = self.db[collection_name]
-                aggregated = self._aggregate_province_totals(collection)
-
-                # 광역시/도별 우세한 feeling 결정
-                totals = aggregated['totals']
-                max_value = max(totals.values())
-                if max_value > 0:
-                    if totals['hot'] == max_value:
-                        weather_stats[collection_name] = 'hot'
-                    elif totals['cold'] == max_value:
-                        weather_stats[collection_name] = 'cold'
-                    else:
-                        weather_stats[collection_name] = 'normal'
-                else:
-                    weather_stats[collection_name] = 'normal'
-            
-                array.update(aggregated['region_details'])
+            for province_name in self.provinces:
+                totals = province_totals.get(province_name, empty_totals)
+                weather_stats[province_name] = self._dominant_feeling_from_totals(totals)
+
+            # 투표가 있는 시군구의 우세한 feeling 배열
+            for region in regions:
+                array[region['name']] = region['dominant_array']
     
         else:  # municipalities
-            for collection_name in self.collections:
-                collection = self.db[collection_name]
-
-                # 서울특별시는 구별로 나누지 않고 전체를 하나로 처리
-                if collection_name == "서울특별시":
-                    aggregated = self._aggregate_province_totals(collection)
-                    totals = aggregated['totals']
-                    max_value = max(totals.values())
-                    if max_value > 0:
-                        if totals['hot'] == max_value:
-                            weather_stats["서울특별시"] = 'hot'
-                        elif totals['cold'] == max_value:
-                            weather_stats["서울특별시"] = 'cold'
-                        else:
-                            weather_stats["서울특별시"] = 'normal'
-                        # 서울 전체의 집계된 데이터 사용
-                        array["서울특별시"] = [sum(totals.values()), 0, 0, 0]
-                    else:
-                        weather_stats["서울특별시"] = 'normal'
-                        array["서울특별시"] = [0, 0, 0, 0, 0, 0]
+            # 서울특별시는 구별로 나누지 않고 전체를 하나로 처리
+            totals = province_totals.get("서울특별시", empty_totals)
+            weather_stats["서울특별시"] = self._dominant_feeling_from_totals(totals)
+            if max(totals.values()) > 0:
+                # 서울 전체의 집계된 데이터 사용
+                array["서울특별시"] = [sum(totals.values()), 0, 0, 0]
+            else:
+                array["서울특별시"] = [0, 0, 0, 0, 0, 0]
 
+            for region in regions:
+                region_name = region['name']
+                if region['votes'] > 0:
+                    weather_stats[region_name] = region['dominant']
+                    array[region_name] = region['dominant_array']
                 else:
-                    for doc in collection.find():
-                        processed = self._analyze_region_data(doc)
-                        region_name = doc['name']
-
-                        if sum(processed['total_votes'].values()) > 0:
-                            weather_stats[region_name] = processed['dominant_feeling']
-                            array[region_name] = processed['dominant_array']
-                        else:
-                            weather_stats[region_name] = 'normal'
-                            array[region_name] = []
+                    weather_stats[region_name] = 'normal'
+                    array[region_name] = []
 
             weather_stats, array = merge_city_data(weather_stats, array)
 
@@ -218,8 +597,14 @@ class DataService:
     
     def get_region_info(self, province, region_name):
         """특정 지역의 상세 정보 반환 (온도, 투표 데이터 등)"""
-        collection = self.db[province]
-        region_doc = collection.find_one({"name": region_name})
+        return self.cache.get_or_load(
+            'get_region_info', (province, region_name),
+            lambda: self._load_region_info(province, region_name),
+            tags=[province]
+        )
+
+    def _load_region_info(self, province, region_name):
+        region_doc = self.store.find_one(province, region_name)
     
         if not region_doc:
             return {"error": "지역을 찾을 수 없습니다"}
@@ -234,67 +619,105 @@ class DataService:
 
     def generate_test_data(self):
         """테스트용 임의 데이터 생성"""
-        updated_count = 0
-        
-        for collection_name in self.collections:
-            collection = self.db[collection_name]
+        requests = []
+        for doc in self.store.find({}, {"_id": 1}):
+            hot_detail = [random.randint(0, 20) for _ in range(5)]
+            normal_detail = [random.randint(0, 20) for _ in range(5)]
+            cold_detail = [random.randint(0, 20) for _ in range(5)]
+            
+            hot_votes = [sum(hot_detail)] + hot_detail
+            normal_votes = [sum(normal_detail)] + normal_detail  
+            cold_votes = [sum(cold_detail)] + cold_detail
             
-            for doc in collection.find():
-                hot_detail = [random.randint(0, 20) for _ in range(5)]
-                normal_detail = [random.randint(0, 20) for _ in range(5)]
-                cold_detail = [random.randint(0, 20) for _ in range(5)]
-                
-                hot_votes = [sum(hot_detail)] + hot_detail
-                normal_votes = [sum(normal_detail)] + normal_detail  
-                cold_votes = [sum(cold_detail)] + cold_detail
-                
-                collection.update_one(
-                    {"_id": doc["_id"]},
-                    {
-                        "$set": {
-                            "hot": hot_votes,
-                            "normal": normal_votes,
-                            "cold": cold_votes
-                        }
+            requests.append(UpdateOne(
+                {"_id": doc["_id"]},
+                {
+                    "$set": {
+                        "hot": hot_votes,
+                        "normal": normal_votes,
+                        "cold": cold_votes
                     }
-                )
-                updated_count += 1
+                }
+            ))
         
+        if requests:
+            self.store.bulk_write(requests)
+        updated_count = len(requests)
+        
+        # 임의 데이터로 덮어썼으므로 누적 문서도 다시 계산
+        self.rebuild_rollup()
+        self.ranking.invalidate()
+        self.cache.invalidate_provinces(self.provinces)
         return updated_count
 
     def get_raw_stats(self, province):
         """특정 광역시/도의 원시 통계 데이터 반환"""
-        collection = self.db[province]
-        aggregated = self._aggregate_province_totals(collection)
+        return self.cache.get_or_load(
+            'get_raw_stats', self._read_args(province),
+            lambda: self._load_raw_stats(province),
+            tags=[province]
+        )
 
-        return aggregated['totals']
+    def _load_raw_stats(self, province):
+        if province not in self.provinces:
+            return {'hot': 0, 'normal': 0, 'cold': 0}
+
+        return self._get_rollup_totals([province])[province]
+
+    def get_ranking_data(self, start=None, end=None):
+        """DB에 저장된 데이터로 랭킹 계산 (start/end를 주면 해당 시간대 투표만 집계)"""
+        return self.cache.get_or_load(
+            'get_ranking_data', self._read_args(start, end),
+            lambda: self._load_ranking_data(start, end),
+            tags=[ALL_PROVINCES]
+        )
 
-    def get_ranking_data(self):
-        """DB에 저장된 데이터로 랭킹 계산"""
+    def _load_ranking_data(self, start=None, end=None):
+        if start or end:
+            return self._load_window_ranking_data(start, end)
+
+        # 전체 투표수는 광역시/도 누적 문서에서 합산
         total_votes = {'hot': 0, 'normal': 0, 'cold': 0}
+        for totals in self._get_rollup_totals(self.provinces).values():
+            for feeling, count in totals.items():
+                total_votes[feeling] += count
+
+        # 가장 많이 투표된 feeling 찾기
+        most_voted_feeling = max(total_votes, key=total_votes.get)
+
+        # 투표수/온도 상위 지역은 정렬 색인에서 바로 조회
+        vote_top_regions, temp_top_regions = self.ranking.top(most_voted_feeling, TOP_N)
+
+        return {
+            'mostVotedFeeling': most_voted_feeling,
+            'voteTopRegions': vote_top_regions,
+            'tempTopRegions': temp_top_regions,
+            'totalVotes': total_votes
+        }
+
+    def _load_window_ranking_data(self, start, end):
+        """시간 범위 랭킹 - 범위마다 값이 달라 색인 없이 버킷 합계로 정렬"""
         all_regions = []
-        
-        for collection_name in self.collections:
-            collection = self.db[collection_name]
-            for doc in collection.find():
-                processed = self._analyze_region_data(doc)
-
-                # 전체 투표수 누적
-                for feeling, count in processed['total_votes'].items():
-                    total_votes[feeling] += count
-                
-                # 지역별 데이터 수집
-                most_voted_feeling = max(processed['total_votes'], key=processed['total_votes'].get)
-                votes_for_feeling = processed['total_votes'][most_voted_feeling]
-
-                all_regions.append({
-                    'province': collection_name,
-                    'region': doc['name'],
-                    'votes': votes_for_feeling,
-                    'temp': doc.get('temperature', None),
-                    'code': doc.get('code', 0)
-                })
-        
+        total_votes = {'hot': 0, 'normal': 0, 'cold': 0}
+
+        # 시간 범위 버킷 합계로 바꾼 시군구 문서
+        for doc in self._read_store().aggregate(self._region_source_pipeline(window=(start, end))):
+            processed = self._analyze_region_data(doc)
+            for feeling, count in processed['total_votes'].items():
+                total_votes[feeling] += count
+
+            # 지역별 데이터 수집
+            most_voted_feeling = max(processed['total_votes'], key=processed['total_votes'].get)
+            votes_for_feeling = processed['total_votes'][most_voted_feeling]
+
+            all_regions.append({
+                'province': doc['province'],
+                'region': doc['name'],
+                'votes': votes_for_feeling,
+                'temp': doc.get('temperature', None),
+                'code': doc.get('code', 0)
+            })
+
         # 가장 많이 투표된 feeling 찾기
         most_voted_feeling = max(total_votes, key=total_votes.get)
 
@@ -311,12 +734,12 @@ class DataService:
             temp_top_regions = sorted(valid_temp_regions, key=lambda x: x['temp'])  # 낮은 온도부터
             print("춥다가 1위 - 낮은 온도부터 정렬")
         else:  # normal
-            temp_top_regions = sorted(valid_temp_regions, key=lambda x: abs(x['temp'] - 20))  # 20도에 가까운 순
+            temp_top_regions = sorted(valid_temp_regions, key=lambda x: abs(x['temp'] - COMFORT_TEMP))  # 20도에 가까운 순
             print("보통이 1위 - 20도에 가까운 순으로 정렬")
         
         return {
             'mostVotedFeeling': most_voted_feeling,
-            'voteTopRegions': vote_top_regions[:20],
-            'tempTopRegions': temp_top_regions[:20],
+            'voteTopRegions': vote_top_regions[:TOP_N],
+            'tempTopRegions': temp_top_regions[:TOP_N],
             'totalVotes': total_votes
         }
\ No newline at end of file
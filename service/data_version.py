@@ -0,0 +1,92 @@
+import atexit
+import threading
+import time
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+
+from dotenv import load_dotenv
+import os
+load_dotenv()
+
+
+class DataVersion:
+    """투표/온도 저장 때마다 올라가는 데이터 세대 번호 (ETag용, 프로세스 간 공유)
+
+    system_info 문서 {type: "data_generation", value}에 저장
+    - bump(): 이 프로세스 값만 바로 올림 (DB에 쓰지 않음 - 투표 요청마다 쓰기가 늘지 않도록)
+    - DATA_VERSION_SYNC_SECONDS마다 백그라운드에서 그동안 올린 횟수를 $inc 1번으로 저장하고
+      다른 프로세스가 올린 값도 함께 읽어 반영
+    - current(): "DB 세대 번호.그 뒤로 이 프로세스에서 올린 횟수" (요청 처리 중에는 DB를 읽지 않음)
+    - external_changes(): 다른 프로세스가 올린 것을 확인한 횟수 (메모리 색인을 다시 읽을지 판단용)
+    """
+    def __init__(self, collection, sync_seconds=None):
+        self.collection = collection
+        self.sync_seconds = sync_seconds or float(os.getenv('DATA_VERSION_SYNC_SECONDS', 1))
+        self._value = None      # 마지막으로 읽거나 저장한 DB 값
+        self._local = 0         # 그 뒤로 이 프로세스에서 올린 횟수
+        self._unsynced = 0      # 아직 DB에 더하지 않은 횟수
+        self._external = 0      # DB 값이 이 프로세스가 더한 것보다 많이 오른 횟수
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def bump(self):
+        with self._lock:
+            self._local += 1
+            self._unsynced += 1
+        self._start()
+
+    def current(self):
+        if self._value is None:
+            self.sync()
+            self._start()
+        with self._lock:
+            return f"{self._value or 0}.{self._local}"
+
+    def external_changes(self):
+        self.current()
+        return self._external
+
+    def sync(self):
+        """올린 횟수를 DB에 더하고 최신 DB 값 반영 (실패하면 다음 주기에 다시 시도)"""
+        with self._lock:
+            count, self._unsynced = self._unsynced, 0
+        try:
+            if count:
+                doc = self.collection.find_one_and_update(
+                    {"type": "data_generation"},
+                    {"$inc": {"value": count}},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+            else:
+                doc = self.collection.find_one({"type": "data_generation"}, {"value": 1})
+        except PyMongoError as e:
+            with self._lock:
+                self._unsynced += count
+            print(f"데이터 세대 번호 동기화 실패: {e}")
+            return None
+
+        value = doc["value"] if doc else 0
+        with self._lock:
+            # DB 값이 바뀌었으면 그 값부터 다시 셈 (저장 중에 올린 횟수는 아직 저장 전이므로 유지)
+            if self._value is not None and value > self._value + count:
+                self._external += 1
+            if self._value is None or value > self._value:
+                self._value = value
+                self._local = self._unsynced
+        return value
+
+    def _start(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is not None:
+                    return
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            # 종료 시 남은 횟수 저장
+            atexit.register(self.sync)
+
+    def _run(self):
+        while True:
+            time.sleep(self.sync_seconds)
+            self.sync()
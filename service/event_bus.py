@@ -0,0 +1,178 @@
+import collections
+import json
+import queue
+import threading
+import time
+
+from dotenv import load_dotenv
+import os
+load_dotenv()
+
+
+class Subscription:
+    """구독자 1명의 전송 대기열"""
+    def __init__(self, max_size):
+        self.queue = queue.Queue(maxsize=max_size)
+
+    def get(self, timeout):
+        """다음 (id, 메시지) 또는 timeout 동안 없으면 None"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventBus:
+    """프로세스 내부 변경 알림 (SSE /stream 용)
+
+    - publish(kind, key, payload): 같은 (kind, key)는 묶음 시간 동안 마지막 값만 남김
+    - payload가 함수면 묶음을 보낼 때 한 번만 호출 (순위처럼 계산이 필요한 값)
+    - 직전에 보낸 값과 같으면 생략
+    - derive(kind, loader, sources): sources 종류의 변경이 있던 묶음에만 loader 결과를 추가
+    - SSE_COALESCE_SECONDS마다 {kind: [payload, ...]} 하나로 묶어 모든 구독자에게 전달
+    - 최근 SSE_HISTORY_SIZE개 묶음을 보관해서 재접속(Last-Event-ID) 시 이어서 전송
+    - 구독자 1명이 요청 스레드 하나를 계속 쓰므로 동시 구독자는 SSE_MAX_SUBSCRIBERS명까지
+      (넘으면 subscribe()가 None - 일반 API 요청에 쓸 워커/스레드를 남겨두기 위해)
+    """
+    def __init__(self, window=None, history_size=None, queue_size=None, max_subscribers=None):
+        self.window = window or float(os.getenv('SSE_COALESCE_SECONDS', 1))
+        self.queue_size = queue_size or int(os.getenv('SSE_QUEUE_SIZE', 100))
+        self.max_subscribers = max_subscribers or int(os.getenv('SSE_MAX_SUBSCRIBERS', 50))
+        self._history = collections.deque(maxlen=history_size or int(os.getenv('SSE_HISTORY_SIZE', 100)))
+        self._pending = {}          # (kind, key) -> payload
+        self._derived = {}          # kind -> (loader, 원본 kind 목록)
+        self._last_sent = {}        # (kind, key) -> 마지막으로 보낸 payload
+        self._subscribers = set()
+        self._last_id = 0
+        self._lock = threading.Condition()
+        self._thread = None
+
+    def publish(self, kind, key, payload):
+        with self._lock:
+            if not self._subscribers:
+                return
+            self._pending[(kind, key)] = payload
+            self._start()
+            self._lock.notify()
+
+    def derive(self, kind, loader, sources):
+        """sources 중 하나라도 바뀐 묶음마다 loader()를 kind 알림으로 추가 (예: 순위)"""
+        self._derived[kind] = (loader, frozenset(sources))
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while not self._pending:
+                    self._lock.wait()
+            # 첫 변경 이후 묶음 시간 동안 모은 뒤 한 번에 전송
+            time.sleep(self.window)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"변경 알림 전송 실패: {e}")
+
+    def flush(self):
+        """모인 변경을 묶어서 구독자에게 전달"""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        changed_kinds = {kind for kind, _ in pending}
+        for kind, (loader, sources) in self._derived.items():
+            if changed_kinds & sources:
+                pending[(kind, None)] = loader
+
+        message = {}
+        for (kind, key), payload in pending.items():
+            if callable(payload):
+                try:
+                    payload = payload()
+                except Exception as e:
+                    print(f"변경 알림 생성 실패 - {kind} {key}: {e}")
+                    continue
+            if payload is None or self._last_sent.get((kind, key)) == payload:
+                continue
+            self._last_sent[(kind, key)] = payload
+            message.setdefault(kind, []).append(payload)
+
+        if not message:
+            return None
+
+        with self._lock:
+            self._last_id += 1
+            event = (self._last_id, json.dumps(message, ensure_ascii=False, default=str))
+            self._history.append(event)
+            for subscription in list(self._subscribers):
+                self._deliver(subscription, event)
+        return event
+
+    def _deliver(self, subscription, event):
+        try:
+            subscription.queue.put_nowait(event)
+        except queue.Full:
+            # 너무 밀린 구독자는 대기열을 비우고 전체 다시 조회하도록 알림
+            with subscription.queue.mutex:
+                subscription.queue.queue.clear()
+            subscription.queue.put_nowait((event[0], None))
+
+    def subscribe(self, last_event_id=None):
+        """구독 시작 - last_event_id 이후 보관된 묶음이 있으면 먼저 넣어둠, 구독자가 가득 찼으면 None
+
+        보관 범위를 벗어난 id(너무 오래됐거나 서버 재시작 전 id)면
+        (id, None)을 넣어 전체 다시 조회하도록 함
+        """
+        subscription = Subscription(self.queue_size)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            if last_event_id is not None:
+                oldest = self._history[0][0] if self._history else self._last_id + 1
+                missed = [event for event in self._history if event[0] > last_event_id]
+                if last_event_id < oldest - 1 or last_event_id > self._last_id \
+                        or len(missed) > self.queue_size:
+                    subscription.queue.put_nowait((self._last_id, None))
+                else:
+                    for event in missed:
+                        subscription.queue.put_nowait(event)
+            # 새 구독자는 직전 값과 같아도 받도록 비교 기준 초기화
+            self._last_sent.clear()
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def stream(self, subscription, heartbeat):
+        """구독 내용을 SSE 형식 문자열로 생성 (클라이언트가 끊어 생성기가 닫히면 구독 해제)
+
+        heartbeat초 동안 보낼 알림이 없으면 주석 한 줄을 보내 끊긴 연결을 알아챔
+        """
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                event = subscription.get(heartbeat)
+                if event is None:
+                    # 프록시가 연결을 끊지 않도록 주석 한 줄 전송
+                    yield ": keep-alive\n\n"
+                    continue
+                event_id, data = event
+                if data is None:
+                    yield f"id: {event_id}\nevent: reset\ndata: {{}}\n\n"
+                else:
+                    yield f"id: {event_id}\nevent: delta\ndata: {data}\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "max_subscribers": self.max_subscribers,
+                "pending": len(self._pending),
+                "last_event_id": self._last_id
+            }
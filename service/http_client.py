@@ -0,0 +1,80 @@
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from dotenv import load_dotenv
+import os
+load_dotenv()
+
+
+class HttpClient:
+    """keep-alive 연결 풀을 공유하는 외부 API 호출용 클라이언트 (호스트별 지연/오류 통계 포함)"""
+    def __init__(self, pool_size=None, max_retries=None, timeout=None):
+        self.pool_size = pool_size or int(os.getenv('HTTP_POOL_SIZE', 16))
+        self.timeout = timeout or float(os.getenv('HTTP_TIMEOUT_SECONDS', 5))
+        max_retries = int(os.getenv('HTTP_MAX_RETRIES', 2)) if max_retries is None else max_retries
+
+        # 연결 단계 오류만 재시도 (요청이 서버에 도달하지 않았으므로 안전)
+        # 응답 코드/타임아웃 재시도는 호출하는 쪽(KmaFetcher 등)에서 처리
+        retry = Retry(total=max_retries, connect=max_retries, read=0, status=0,
+                      backoff_factor=0.2, raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=self.pool_size, max_retries=retry)
+
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._stats = {}    # 호스트 -> 통계
+        self._lock = threading.Lock()
+
+    def get(self, url, **kwargs):
+        """GET 요청 (timeout 기본값 적용, 호스트별 통계 기록)"""
+        kwargs.setdefault('timeout', self.timeout)
+        host = urlsplit(url).netloc
+        started = time.monotonic()
+        try:
+            response = self.session.get(url, **kwargs)
+        except requests.exceptions.RequestException:
+            self._record(host, time.monotonic() - started, error=True)
+            raise
+
+        self._record(host, time.monotonic() - started, error=response.status_code >= 500)
+        return response
+
+    def _record(self, host, elapsed, error):
+        with self._lock:
+            stats = self._stats.setdefault(host, {"requests": 0, "errors": 0, "total_ms": 0.0, "max_ms": 0.0})
+            stats["requests"] += 1
+            stats["errors"] += int(error)
+            elapsed_ms = elapsed * 1000
+            stats["total_ms"] += elapsed_ms
+            stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+
+    def stats(self):
+        """호스트별 요청 수, 오류 수, 평균/최대 응답 지연(ms)"""
+        with self._lock:
+            return {
+                host: {
+                    "requests": s["requests"],
+                    "errors": s["errors"],
+                    "avg_ms": round(s["total_ms"] / s["requests"], 1) if s["requests"] else 0.0,
+                    "max_ms": round(s["max_ms"], 1)
+                }
+                for host, s in self._stats.items()
+            }
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def get_http_client():
+    """프로세스 전체에서 공유하는 HttpClient 반환"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = HttpClient()
+        return _shared_client
@@ -0,0 +1,113 @@
+from pymongo import ASCENDING
+from pymongo.errors import OperationFailure
+
+from dotenv import load_dotenv
+import os
+load_dotenv()
+
+# 시간대별 투표 버킷 보관 기간 (TTL 인덱스로 자동 삭제)
+VOTE_BUCKET_RETENTION_SECONDS = int(float(os.getenv('VOTE_BUCKET_RETENTION_DAYS', 30)) * 86400)
+# 끝난 작업(온도 갱신 등) 상태 문서 보관 기간
+JOB_RETENTION_SECONDS = int(float(os.getenv('JOB_RETENTION_HOURS', 24)) * 3600)
+
+# 컬렉션별 필수 인덱스 선언
+# (데이터베이스, 컬렉션) -> [{name, keys, 추가 옵션...}]
+INDEXES = {
+    ("korea_regions_db", "regions"): [
+        # 투표/퀴즈/지역 정보: {"province": ..., "name": ...}
+        {"name": "province_name", "keys": [("province", ASCENDING), ("name", ASCENDING)]},
+        # 온도 갱신 시 관측소 코드로 조회
+        {"name": "code", "keys": [("code", ASCENDING)]},
+    ],
+    ("korea_regions_db", "vote_buckets"): [
+        # 투표 시 시간 버킷 upsert, 시간 범위 조회
+        {"name": "province_name_hour", "keys": [("province", ASCENDING), ("name", ASCENDING), ("hour", ASCENDING)],
+         "unique": True},
+        # 보관 기간이 지난 버킷 자동 삭제
+        {"name": "hour_ttl", "keys": [("hour", ASCENDING)], "expireAfterSeconds": VOTE_BUCKET_RETENTION_SECONDS},
+    ],
+    ("korea_regions_db", "jobs"): [
+        # 같은 작업은 대기/실행 중인 것이 1개만 (끝나면 active_key를 지워 인덱스에서 빠짐)
+        {"name": "active_key", "keys": [("active_key", ASCENDING)], "unique": True,
+         "partialFilterExpression": {"active_key": {"$exists": True}}},
+        # 끝난 작업 문서 자동 삭제 (finished_at이 없는 대기/실행 중 문서는 대상 아님)
+        {"name": "finished_at_ttl", "keys": [("finished_at", ASCENDING)], "expireAfterSeconds": JOB_RETENTION_SECONDS},
+    ],
+    ("korea_regions_db", "system_info"): [
+        # {"type": "last_temp_update"} 등 시스템 상태 문서
+        {"name": "type", "keys": [("type", ASCENDING)], "unique": True},
+    ],
+    ("AdditionalFeature", "recommendations"): [
+        # 감정별 문서를 _id로만 조회/갱신 (이전 clothes_name/food_name 인덱스는 미선언으로 보고됨)
+    ],
+    ("AdditionalFeature", "recommend_sessions"): [
+        # 만료된 추천 세션 자동 삭제 (RECOMMEND_SESSION_BACKEND=mongo일 때)
+        {"name": "expires_at_ttl", "keys": [("expires_at", ASCENDING)], "expireAfterSeconds": 0},
+    ],
+}
+
+
+def _create(collection, spec):
+    options = {key: value for key, value in spec.items() if key not in ("name", "keys")}
+    collection.create_index(spec["keys"], name=spec["name"], **options)
+
+
+def ensure_collection_indexes(collection):
+    """컬렉션 하나의 선언된 인덱스 생성 (이미 있으면 그대로)"""
+    key = (collection.database.name, collection.name)
+    for spec in INDEXES.get(key, []):
+        _create(collection, spec)
+
+
+def ensure_indexes(client):
+    """선언된 모든 인덱스를 생성하고 (컬렉션, 인덱스 이름, 결과) 목록 반환"""
+    results = []
+    for (db_name, collection_name), specs in INDEXES.items():
+        collection = client[db_name][collection_name]
+        existing = collection.index_information()
+        for spec in specs:
+            label = f"{db_name}.{collection_name}"
+            if spec["name"] in existing:
+                results.append((label, spec["name"], "exists"))
+                continue
+            try:
+                _create(collection, spec)
+                results.append((label, spec["name"], "created"))
+            except OperationFailure as e:
+                # 같은 키에 다른 이름/옵션의 인덱스가 있는 경우 등
+                results.append((label, spec["name"], f"failed: {e}"))
+    return results
+
+
+def index_report(client):
+    """컬렉션별 누락/미사용/미선언 인덱스 보고
+
+    미사용 여부는 $indexStats의 accesses.ops 기준 (서버 재시작 이후 누적값)
+    """
+    report = {}
+    for (db_name, collection_name), specs in INDEXES.items():
+        collection = client[db_name][collection_name]
+        existing = collection.index_information()
+        existing_keys = {name: info["key"] for name, info in existing.items()}
+
+        missing = [
+            spec["name"] for spec in specs
+            if spec["name"] not in existing and list(spec["keys"]) not in existing_keys.values()
+        ]
+        declared = {spec["name"] for spec in specs} | {"_id_"}
+        undeclared = [name for name in existing if name not in declared]
+
+        unused = []
+        try:
+            for stats in collection.aggregate([{"$indexStats": {}}]):
+                if stats["name"] != "_id_" and stats["accesses"]["ops"] == 0:
+                    unused.append(stats["name"])
+        except OperationFailure as e:
+            print(f"$indexStats 조회 실패 - {db_name}.{collection_name}: {e}")
+
+        report[f"{db_name}.{collection_name}"] = {
+            "missing": missing,
+            "unused": sorted(unused),
+            "undeclared": undeclared,
+        }
+    return report
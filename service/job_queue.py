@@ -0,0 +1,105 @@
+import datetime
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from index_registry import ensure_collection_indexes
+
+from dotenv import load_dotenv
+import os
+load_dotenv()
+
+# 작업 상태
+QUEUED = 'queued'
+RUNNING = 'running'
+COMPLETED = 'completed'
+FAILED = 'failed'
+
+
+class JobQueue:
+    """오래 걸리는 작업(온도 갱신 등)을 요청 처리 스레드 밖에서 실행하는 작업 큐
+
+    jobs 컬렉션 문서: {_id, type, params, status, active_key, result, error, created_at, started_at, finished_at}
+    - enqueue는 작업 문서를 만들고 바로 id 반환, 실행은 JOB_MAX_WORKERS개 스레드가 담당
+    - 같은 종류/인자의 작업이 대기/실행 중이면 새로 만들지 않고 그 작업 id 반환
+      (대기/실행 중에만 있는 active_key의 unique 부분 인덱스로 여러 프로세스 사이에서도 1개만 등록)
+    - JOB_STALE_MINUTES보다 오래된 미완료 작업은 죽은 프로세스의 작업으로 보고 실패 처리 후 새로 등록
+    - 상태는 DB에 남으므로 다른 프로세스에서도 /jobs/<id>로 조회 가능
+    - 끝난 작업 문서는 TTL 인덱스로 JOB_RETENTION_HOURS 뒤 삭제
+    """
+    def __init__(self, db, max_workers=None):
+        self.collection = db.jobs
+        self.max_workers = max_workers or int(os.getenv('JOB_MAX_WORKERS', 2))
+        self.stale_after = datetime.timedelta(minutes=float(os.getenv('JOB_STALE_MINUTES', 30)))
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        self._handlers = {}
+
+    def ensure_indexes(self):
+        ensure_collection_indexes(self.collection)
+
+    def register(self, job_type, handler):
+        """작업 종류별 실행 함수 등록 - handler(**params)의 반환값(dict)이 작업 결과"""
+        self._handlers[job_type] = handler
+
+    def enqueue(self, job_type, **params):
+        """작업 등록 후 id 반환 (같은 작업이 이미 대기/실행 중이면 그 id)"""
+        if job_type not in self._handlers:
+            raise ValueError(f"알 수 없는 작업 종류: {job_type}")
+
+        # 같은 작업을 나타내는 키 (인자 순서와 무관)
+        active_key = f"{job_type}:{json.dumps(params, sort_keys=True, default=str)}"
+        for _ in range(3):
+            now = datetime.datetime.now()
+            job_id = uuid.uuid4().hex
+            try:
+                job = self.collection.find_one_and_update(
+                    {"active_key": active_key},
+                    {"$setOnInsert": {
+                        "_id": job_id,
+                        "type": job_type,
+                        "params": params,
+                        "status": QUEUED,
+                        "created_at": now
+                    }},
+                    projection={"_id": 1, "created_at": 1},
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+            except DuplicateKeyError:
+                # 다른 프로세스가 동시에 등록함 - 그 작업을 다시 조회
+                continue
+
+            if job["_id"] == job_id:
+                self._executor.submit(self._run, job_id, job_type, params)
+                return job_id
+            if job["created_at"] >= now - self.stale_after:
+                return job["_id"]
+
+            # 죽은 프로세스가 남긴 작업은 실패 처리하고 새로 등록
+            self.collection.update_one(
+                {"_id": job["_id"], "active_key": active_key},
+                {"$set": {"status": FAILED, "error": "작업 시간 초과 (실행 프로세스 없음)", "finished_at": now},
+                 "$unset": {"active_key": ""}}
+            )
+
+        raise RuntimeError(f"작업 등록 실패: {job_type}")
+
+    def _run(self, job_id, job_type, params):
+        self.collection.update_one(
+            {"_id": job_id},
+            {"$set": {"status": RUNNING, "started_at": datetime.datetime.now()}}
+        )
+        try:
+            result = self._handlers[job_type](**params)
+            update = {"status": COMPLETED, "result": result}
+        except Exception as e:
+            print(f"작업 실패 - {job_type} {job_id}: {e}")
+            update = {"status": FAILED, "error": str(e)}
+
+        update["finished_at"] = datetime.datetime.now()
+        self.collection.update_one({"_id": job_id}, {"$set": update, "$unset": {"active_key": ""}})
+
+    def get(self, job_id):
+        """작업 상태 문서 (없으면 None)"""
+        return self.collection.find_one({"_id": job_id})
@@ -0,0 +1,191 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from http_client import get_http_client
+
+from dotenv import load_dotenv
+import os
+load_dotenv()
+
+KMA_AWS_URL = 'https://apihub.kma.go.kr/api/typ01/cgi-bin/url/nph-aws2_min'
+# 결측값은 -99.0, -99.9 등으로 내려옴 (실제 기온이 될 수 없는 값 이하는 자료 없음으로 처리)
+KMA_MISSING_BELOW = -90
+
+
+def parse_aws_lines(lines, wanted=None):
+    """AWS 응답을 한 줄씩 읽어 (관측소 코드, 기온) 생성
+
+    lines: iter_lines() 등 줄 단위 반복자 (bytes 또는 str)
+    wanted: 필요한 관측소 코드 집합 (None이면 전부)
+    """
+    for raw in lines:
+        if not raw:
+            continue
+        line = raw.decode('ascii', errors='ignore') if isinstance(raw, bytes) else raw
+        if line.startswith('#'):
+            continue
+
+        # 컬럼: 시각, 관측소(STN), ..., 기온(TA, 9번째)
+        columns = line.split()
+        if len(columns) <= 8 or not columns[1].isdigit():
+            continue
+
+        code = int(columns[1])
+        if wanted is not None and code not in wanted:
+            continue
+        if not columns[8].replace('.', '').replace('-', '').isdigit():
+            continue
+        temp = float(columns[8])
+        if temp > KMA_MISSING_BELOW:
+            yield code, temp
+
+
+class TokenBucket:
+    """초당 rate개 요청을 허용하는 토큰 버킷 (최대 capacity개까지 몰아서 사용 가능)"""
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 1개를 얻을 때까지 대기"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class KmaFetcher:
+    """기상청 AWS 매분자료 API 동시 조회기 (동시 실행 수 제한 + 토큰 버킷 + 재시도)"""
+    def __init__(self, auth_key, base_url=None, max_workers=None, rate=None,
+                 max_retries=None, backoff=None, timeout=5, mode=None, http=None):
+        self.auth_key = auth_key
+        self.http = http or get_http_client()    # 공유 연결 풀
+        self.base_url = base_url or os.getenv('KMA_API_URL', KMA_AWS_URL)
+        self.max_workers = max_workers or int(os.getenv('KMA_MAX_WORKERS', 8))
+        self.max_retries = int(os.getenv('KMA_MAX_RETRIES', 3)) if max_retries is None else max_retries
+        self.backoff = float(os.getenv('KMA_BACKOFF_SECONDS', 0.5)) if backoff is None else backoff
+        self.timeout = timeout
+        self.rate_limiter = TokenBucket(rate or float(os.getenv('KMA_RATE_PER_SEC', 10)))
+        # batch: stn=0 한 번 호출로 전체 관측소 조회, station: 관측소별 조회
+        self.mode = mode or os.getenv('KMA_FETCH_MODE', 'batch')
+        self.batch_min_stations = int(os.getenv('KMA_BATCH_MIN_STATIONS', 20))
+
+    def _get(self, stn):
+        """API 호출 (일시적 오류는 지수 백오프로 재시도), 스트리밍 응답 또는 None 반환"""
+        params = {
+            'tm2': '0',
+            'stn': stn,
+            'disp': '0',
+            'authKey': self.auth_key,
+            'inf': 'AWS'
+        }
+
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            try:
+                response = self.http.get(self.base_url, params=params, verify=True,
+                                         timeout=self.timeout, stream=True)
+                if response.status_code == 200:
+                    return response
+                response.close()
+                if response.status_code < 500 and response.status_code != 429:
+                    # 요청 자체가 잘못된 경우는 재시도하지 않음
+                    return None
+                error = requests.exceptions.HTTPError(f"HTTP {response.status_code}")
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                error = e
+
+            if attempt < self.max_retries:
+                time.sleep(self.backoff * (2 ** attempt))
+
+        raise error
+
+    def fetch_temperature(self, code):
+        """관측소 1곳의 현재 기온 조회"""
+        response = self._get(code)
+        if response is None:
+            return None
+
+        with response:
+            for _, temp in parse_aws_lines(response.iter_lines(), {int(code)}):
+                return temp
+        return None
+
+    def fetch_all(self, codes):
+        """전체 관측소(stn=0) 한 번 호출로 필요한 관측소 기온만 골라서 반환 {코드: 기온}"""
+        wanted = {int(code) for code in codes}
+        temps = {}
+
+        response = self._get(0)
+        if response is None:
+            raise requests.exceptions.HTTPError("전체 관측소 조회 실패")
+
+        with response:
+            for code, temp in parse_aws_lines(response.iter_lines(), wanted):
+                temps.setdefault(code, temp)
+                if len(temps) == len(wanted):
+                    break
+        return temps
+
+    def fetch_stations(self, codes):
+        """관측소 목록 조회 - 관측소가 많으면 일괄 모드, 실패하거나 적으면 관측소별 동시 조회
+
+        일괄 응답에 없는 관측소는 관측소별로 다시 조회하고, 그래도 기온이 없으면 오류로 보고
+        반환: ({코드: 기온}, {코드: 오류 메시지})
+        """
+        codes = list(codes)
+        temps, errors = None, {}
+        if self.mode == 'batch' and len(codes) >= self.batch_min_stations:
+            try:
+                batch = self.fetch_all(codes)
+                temps = {code: batch[int(code)] for code in codes if int(code) in batch}
+            except Exception as e:
+                print(f"전체 관측소 일괄 조회 실패, 관측소별 조회로 전환: {e}")
+
+        if temps is None:
+            temps, errors = self.fetch_many({code: code for code in codes})
+        else:
+            missing = [code for code in codes if code not in temps]
+            if missing:
+                print(f"전체 관측소 응답에 없는 관측소 {len(missing)}개 관측소별 조회")
+                retried, errors = self.fetch_many({code: code for code in missing})
+                temps.update(retried)
+
+        for code in codes:
+            if code not in temps and code not in errors:
+                errors[code] = "기온 자료 없음"
+        return temps, errors
+
+    def fetch_many(self, jobs):
+        """여러 관측소 동시 조회
+
+        jobs: {키: 관측소 코드}
+        반환: ({키: 기온}, {키: 오류 메시지}) - 기온이 없는 응답은 결과에서 제외
+        """
+        results = {}
+        errors = {}
+        if not jobs:
+            return results, errors
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {key: executor.submit(self.fetch_temperature, code) for key, code in jobs.items()}
+            for key, future in futures.items():
+                try:
+                    temp = future.result()
+                    if temp is not None:
+                        results[key] = temp
+                except Exception as e:
+                    errors[key] = str(e) or e.__class__.__name__
+
+        return results, errors
@@ -0,0 +1,158 @@
+import base64
+import hashlib
+import hmac
+import ipaddress
+import threading
+import time
+from urllib.parse import urlencode
+from cache_service import TTLCache
+from http_client import get_http_client
+
+from dotenv import load_dotenv
+import os
+load_dotenv()
+
+NAVER_GEO_URL = 'https://geolocation.apigw.ntruss.com'
+GEO_PATH = '/geolocation/v2/geoLocation'
+
+
+def make_signature(method, basestring, timestamp, access_key, secret_key):
+    message = f"{method} {basestring}\n{timestamp}\n{access_key}"
+    message = message.encode('utf-8')
+    secret_key = secret_key.encode('utf-8')
+    signature = base64.b64encode(
+        hmac.new(secret_key, message, digestmod=hashlib.sha256).digest()
+    ).decode('utf-8')
+    return signature
+
+
+def ip_prefix(ip):
+    """캐시 키로 쓸 IP 대역 (IPv4 /24, IPv6 /48)"""
+    try:
+        address = ipaddress.ip_address(ip)
+    except ValueError:
+        return ip
+    prefix = 24 if address.version == 4 else 48
+    return str(ipaddress.ip_network(f"{address}/{prefix}", strict=False))
+
+
+class LocationService:
+    """네이버 위치 조회 API + IP 대역 단위 캐시
+
+    - 같은 대역은 GEO_CACHE_TTL 동안 캐시 결과 사용
+    - 만료됐지만 GEO_STALE_TTL 이내인 결과는 바로 돌려주고 백그라운드에서 갱신
+    - 같은 대역 동시 요청은 업스트림 호출 1번으로 합침
+    - lookup(ip, wait)은 요청 처리 스레드가 wait초까지만 기다리고 조회는 백그라운드에서 계속
+    """
+    def __init__(self, access_key=None, secret_key=None, base_url=None, http=None,
+                 ttl=None, stale_ttl=None, max_size=None, timeout=None):
+        self.access_key = access_key or os.getenv('NAVER_ACCESS_KEY')
+        self.secret_key = secret_key or os.getenv('NAVER_SECRET_KEY')
+        self.base_url = base_url or os.getenv('NAVER_GEO_URL', NAVER_GEO_URL)
+        self.http = http or get_http_client()
+        self.ttl = ttl or float(os.getenv('GEO_CACHE_TTL', 3600))
+        self.timeout = timeout or float(os.getenv('GEO_UPSTREAM_TIMEOUT', 2))
+        self.request_wait = float(os.getenv('GEO_REQUEST_WAIT_SECONDS', 1))
+        stale_ttl = stale_ttl or float(os.getenv('GEO_STALE_TTL', 86400))
+        # 항목은 stale_ttl 동안 보관하고, 신선도는 저장 시각으로 따로 판단
+        self.cache = TTLCache(max_size=max_size or int(os.getenv('GEO_CACHE_MAX_SIZE', 10000)),
+                              ttl=stale_ttl)
+        self._inflight = {}     # 대역 -> 진행 중인 조회 완료 이벤트
+        self._lock = threading.Lock()
+
+    def _request_location(self, ip):
+        """네이버 위치 조회 API 호출, (광역시/도, 시군구) 또는 None 반환"""
+        params = {
+            "ip": ip,
+            "ext": "t",
+            "enc": "utf-8",
+            "responseFormatType": "json"
+        }
+        query = urlencode(params)
+        basestring = f"{GEO_PATH}?{query}"
+        timestamp = str(int(time.time() * 1000))
+        signature = make_signature("GET", basestring, timestamp, self.access_key, self.secret_key)
+
+        headers = {
+            'x-ncp-apigw-timestamp': timestamp,
+            'x-ncp-iam-access-key': self.access_key,
+            'x-ncp-apigw-signature-v2': signature
+        }
+        response = self.http.get(f"{self.base_url}{basestring}", headers=headers, timeout=self.timeout).json()
+
+        if 'geoLocation' in response:
+            r1 = response['geoLocation']['r1']  # 광역시/도
+            r2 = response['geoLocation']['r2'].split()[0]  # 시/군/구
+            return r1, r2
+        return None
+
+    def _refresh(self, key, ip):
+        """대역별로 한 번만 업스트림 조회 (이미 진행 중이면 그 결과를 기다림)"""
+        with self._lock:
+            event = self._inflight.get(key)
+            leader = event is None
+            if leader:
+                event = self._inflight[key] = threading.Event()
+
+        if not leader:
+            event.wait(self.timeout * 2)
+            found, entry = self.cache.get(key)
+            return entry[1] if found else None
+
+        try:
+            location = self._request_location(ip)
+            if location:
+                self.cache.set(key, (time.monotonic(), location))
+            return location
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            event.set()
+
+    def _refresh_in_background(self, key, ip):
+        """대역 조회를 백그라운드 스레드에서 시작 (이미 진행 중이면 그대로), 완료 이벤트 반환"""
+        with self._lock:
+            event = self._inflight.get(key)
+            if event is not None:
+                return event
+            event = self._inflight[key] = threading.Event()
+
+        def run():
+            try:
+                location = self._request_location(ip)
+                if location:
+                    self.cache.set(key, (time.monotonic(), location))
+            except Exception as e:
+                print(f"위치 캐시 갱신 실패: {e}")
+            finally:
+                with self._lock:
+                    del self._inflight[key]
+                event.set()
+
+        threading.Thread(target=run, daemon=True).start()
+        return event
+
+    def lookup(self, ip, wait=None):
+        """IP의 (광역시/도, 시군구) 조회, 찾지 못하면 None
+
+        wait을 주면 캐시에 없을 때 최대 wait초만 기다림 (늦게 온 결과는 캐시에 저장되어 다음 요청에 사용)
+        """
+        key = ip_prefix(ip)
+        found, entry = self.cache.get(key)
+
+        if found:
+            fetched_at, location = entry
+            if time.monotonic() - fetched_at >= self.ttl:
+                # 오래된 결과는 바로 돌려주고 갱신은 백그라운드에서
+                self._refresh_in_background(key, ip)
+            return location
+
+        if wait is None:
+            return self._refresh(key, ip)
+
+        self._refresh_in_background(key, ip).wait(wait)
+        found, entry = self.cache.get(key)
+        return entry[1] if found else None
+
+    def stats(self):
+        return self.cache.stats()
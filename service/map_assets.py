@@ -0,0 +1,300 @@
+import gzip
+import hashlib
+import json
+
+from dotenv import load_dotenv
+import os
+load_dotenv()
+
+try:
+    import brotli
+except ImportError:     # brotli 패키지가 없으면 gzip 압축본만 생성
+    brotli = None
+
+# 원본 GeoJSON (static/data, southkorea-maps)
+MAP_SOURCES = {
+    "provinces": "skorea-provinces-2018-geo.json",
+    "municipalities": "skorea-municipalities-2018-geo.json",
+}
+
+# 해상도별 (양자화 격자 크기, 단순화 허용 오차(격자 단위))
+# 전국 지도(줌 1배) 기준 low도 1px보다 작은 오차, high는 최대 줌(10배)용
+RESOLUTIONS = {
+    "low": (10000, 8),
+    "medium": (10000, 2),
+    "high": (100000, 5),
+}
+
+MANIFEST_NAME = "manifest.json"
+
+
+# 양자화
+def _bbox(features):
+    xs, ys = [], []
+    for feature in features:
+        for polygon in _polygons(feature.get("geometry")):
+            for ring in polygon:
+                xs.extend(point[0] for point in ring)
+                ys.extend(point[1] for point in ring)
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _polygons(geometry):
+    """Polygon/MultiPolygon을 폴리곤 목록으로 (그 외 형식은 빈 목록)"""
+    if not geometry:
+        return []
+    if geometry["type"] == "Polygon":
+        return [geometry["coordinates"]]
+    if geometry["type"] == "MultiPolygon":
+        return geometry["coordinates"]
+    return []
+
+
+def _quantize_ring(ring, transform):
+    (x0, y0), (kx, ky) = transform
+    points = []
+    for x, y in ring:
+        point = (round((x - x0) * kx), round((y - y0) * ky))
+        if not points or points[-1] != point:
+            points.append(point)
+    if points[0] != points[-1]:
+        points.append(points[0])
+    return points
+
+
+# 토폴로지 (인접한 지역이 공유하는 경계선을 arc 하나로)
+def _junctions(rings):
+    """둘 이상의 경계선이 만나거나 갈라지는 점"""
+    neighbors = {}
+    junctions = set()
+    for ring in rings:
+        n = len(ring) - 1
+        for i in range(n):
+            point = ring[i]
+            pair = frozenset((ring[i - 1], ring[i + 1]))
+            seen = neighbors.setdefault(point, pair)
+            if seen != pair:
+                junctions.add(point)
+    return junctions
+
+
+def _split_ring(ring, junctions):
+    """고리를 교차점마다 잘라 arc 목록으로 (교차점이 없으면 닫힌 arc 하나)"""
+    points = ring[:-1]
+    cuts = [i for i, point in enumerate(points) if point in junctions]
+    if not cuts:
+        return [ring]
+    # 첫 교차점에서 시작하도록 회전
+    start = cuts[0]
+    points = points[start:] + points[:start]
+    cuts = [i - start for i in cuts]
+    arcs = []
+    for a, b in zip(cuts, cuts[1:] + [len(points)]):
+        arcs.append(points[a:b + 1] if b < len(points) else points[a:] + [points[0]])
+    return arcs
+
+
+def _canonical_ring(points):
+    """닫힌 arc 비교용 - 가장 작은 점에서 시작하도록 회전"""
+    body = points[:-1]
+    start = body.index(min(body))
+    body = body[start:] + body[:start]
+    return tuple(body + [body[0]])
+
+
+class _ArcIndex:
+    """같은 경계선(정방향/역방향)은 arc 하나만 저장"""
+    def __init__(self):
+        self.arcs = []
+        self._index = {}
+
+    def add(self, points):
+        closed = points[0] == points[-1]
+        key = _canonical_ring(points) if closed else tuple(points)
+        if key in self._index:
+            return self._index[key]
+        reverse = _canonical_ring(points[::-1]) if closed else tuple(points[::-1])
+        if reverse in self._index:
+            return ~self._index[reverse]
+        self._index[key] = len(self.arcs)
+        self.arcs.append(list(key) if closed else points)
+        return len(self.arcs) - 1
+
+
+# 단순화
+def _simplify(points, tolerance):
+    """Douglas-Peucker (양 끝점 유지, 닫힌 arc는 최소 4개 점 유지)"""
+    if len(points) <= 2 or tolerance <= 0:
+        return points
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    closed = points[0] == points[-1]
+    if closed:
+        # 시작점에서 가장 먼 점으로 나눠서 각각 단순화
+        far = max(range(1, len(points) - 1),
+                  key=lambda i: (points[i][0] - points[0][0]) ** 2 + (points[i][1] - points[0][1]) ** 2)
+        keep[far] = True
+        stack = [(0, far), (far, len(points) - 1)]
+    else:
+        stack = [(0, len(points) - 1)]
+
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        (ax, ay), (bx, by) = points[a], points[b]
+        dx, dy = bx - ax, by - ay
+        length = (dx * dx + dy * dy) ** 0.5
+        best, best_distance = None, -1
+        for i in range(a + 1, b):
+            px, py = points[i]
+            if length:
+                distance = abs(dy * (px - ax) - dx * (py - ay)) / length
+            else:
+                distance = ((px - ax) ** 2 + (py - ay) ** 2) ** 0.5
+            if distance > best_distance:
+                best, best_distance = i, distance
+        if best_distance > tolerance:
+            keep[best] = True
+            stack.append((a, best))
+            stack.append((best, b))
+
+    simplified = [point for point, kept in zip(points, keep) if kept]
+    if closed and len(simplified) < 4:
+        # 면적이 남도록 가장 먼 점 하나 더 유지
+        extra = max((i for i in range(1, len(points) - 1) if not keep[i]),
+                    key=lambda i: abs(i - far), default=None)
+        if extra is not None:
+            keep[extra] = True
+            simplified = [point for point, kept in zip(points, keep) if kept]
+    return simplified
+
+
+def _delta_encode(points):
+    encoded = [list(points[0])]
+    for (px, py), (x, y) in zip(points, points[1:]):
+        encoded.append([x - px, y - py])
+    return encoded
+
+
+def to_topojson(geojson, object_name, quantization, tolerance):
+    """GeoJSON FeatureCollection -> 양자화/단순화한 TopoJSON (dict)
+
+    - 좌표를 quantization x quantization 격자의 정수로 바꾸고 arc는 차이값으로 저장
+    - 이웃 지역과 공유하는 경계선은 arc 하나로 저장 후 단순화 (경계선이 어긋나지 않음)
+    """
+    features = geojson["features"]
+    x0, y0, x1, y1 = _bbox(features)
+    kx = (quantization - 1) / (x1 - x0) if x1 > x0 else 1
+    ky = (quantization - 1) / (y1 - y0) if y1 > y0 else 1
+    transform = ((x0, y0), (kx, ky))
+
+    quantized = [
+        [[_quantize_ring(ring, transform) for ring in polygon] for polygon in _polygons(feature.get("geometry"))]
+        for feature in features
+    ]
+    # 양자화로 점이 3개 미만이 된 고리는 제외 (바깥 고리가 없어지면 폴리곤 전체 제외)
+    quantized = [[[ring for ring in polygon if len(ring) >= 4] for polygon in polygons if len(polygon[0]) >= 4]
+                 for polygons in quantized]
+
+    junctions = _junctions([ring for polygons in quantized for polygon in polygons for ring in polygon])
+    arc_index = _ArcIndex()
+    geometries = []
+    for feature, polygons in zip(features, quantized):
+        arcs = [[[arc_index.add(arc) for arc in _split_ring(ring, junctions)] for ring in polygon]
+                for polygon in polygons]
+        geometry = {"properties": feature.get("properties", {})}
+        if not arcs:
+            geometry["type"] = None
+        elif feature["geometry"]["type"] == "Polygon":
+            geometry.update(type="Polygon", arcs=arcs[0])
+        else:
+            geometry.update(type="MultiPolygon", arcs=arcs)
+        geometries.append(geometry)
+
+    return {
+        "type": "Topology",
+        "bbox": [x0, y0, x1, y1],
+        "transform": {"scale": [1 / kx, 1 / ky], "translate": [x0, y0]},
+        "objects": {object_name: {"type": "GeometryCollection", "geometries": geometries}},
+        "arcs": [_delta_encode(_simplify(arc, tolerance)) for arc in arc_index.arcs],
+    }
+
+
+# 빌드 / 매니페스트
+def _write_asset(output_dir, layer, resolution, body):
+    digest = hashlib.sha256(body).hexdigest()[:12]
+    filename = f"{layer}-{resolution}.{digest}.topo.json"
+    path = os.path.join(output_dir, filename)
+    with open(path, "wb") as f:
+        f.write(body)
+    with open(path + ".gz", "wb") as f:
+        f.write(gzip.compress(body, compresslevel=9))
+    if brotli:
+        with open(path + ".br", "wb") as f:
+            f.write(brotli.compress(body, quality=11))
+    return filename
+
+
+def load_manifest(output_dir):
+    """{레이어: {해상도: 파일 이름}}, 빌드하지 않았으면 빈 dict"""
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+class MapManifest:
+    """서버에서 쓰는 매니페스트 - 다시 빌드하면(파일 수정 시각이 바뀌면) 다음 조회부터 반영"""
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self._mtime = None
+        self._manifest = {}
+
+    def get(self):
+        try:
+            mtime = os.path.getmtime(os.path.join(self.output_dir, MANIFEST_NAME))
+        except OSError:
+            return {}
+        if mtime != self._mtime:
+            self._manifest = load_manifest(self.output_dir)
+            self._mtime = mtime
+        return self._manifest
+
+
+def _asset_files(manifest):
+    return {filename for resolutions in manifest.values() for filename in resolutions.values()}
+
+
+def build_map_assets(source_dir, output_dir):
+    """레이어 x 해상도별 TopoJSON 파일과 gzip/brotli 압축본, manifest.json 생성
+
+    파일 이름에 내용 해시를 넣으므로 바뀐 파일만 새 이름이 됨
+    직전 빌드 파일은 이전 페이지를 연 사용자를 위해 남기고 그보다 오래된 파일은 삭제
+    반환: (매니페스트, {파일 이름: 바이트 수})
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    previous = load_manifest(output_dir)
+
+    manifest = {}
+    sizes = {}
+    for layer, source in MAP_SOURCES.items():
+        with open(os.path.join(source_dir, source), encoding="utf-8") as f:
+            geojson = json.load(f)
+        for resolution, (quantization, tolerance) in RESOLUTIONS.items():
+            topology = to_topojson(geojson, layer, quantization, tolerance)
+            body = json.dumps(topology, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            filename = _write_asset(output_dir, layer, resolution, body)
+            manifest.setdefault(layer, {})[resolution] = filename
+            sizes[filename] = len(body)
+
+    keep = _asset_files(manifest) | _asset_files(previous)
+    for filename in os.listdir(output_dir):
+        base = filename.removesuffix(".gz").removesuffix(".br")
+        if base.endswith(".topo.json") and base not in keep:
+            os.remove(os.path.join(output_dir, filename))
+
+    with open(os.path.join(output_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest, sizes
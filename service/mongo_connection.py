@@ -0,0 +1,177 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pymongo import monitoring, ReadPreference
+from pymongo.read_preferences import SecondaryPreferred
+from pymongo.mongo_client import MongoClient
+import certifi
+
+from dotenv import load_dotenv
+import os
+load_dotenv()
+
+
+# 읽기 전용 조회를 세컨더리로 보낼지 여부와 허용 지연 (세컨더리가 이보다 뒤처지면 제외)
+REPLICA_READS = os.getenv('MONGO_REPLICA_READS', 'true').lower() != 'false'
+MAX_STALENESS_SECONDS = int(os.getenv('MONGO_MAX_STALENESS_SECONDS', 90))  # 드라이버 최소값 90
+
+# 현재 요청이 프라이머리에서 읽어야 하는지 (방금 쓴 데이터를 바로 봐야 하는 요청)
+_primary_reads = ContextVar('primary_reads', default=False)
+
+
+def replica_read_preference():
+    """지연을 허용하는 읽기 전용 조회용 read preference"""
+    if not REPLICA_READS:
+        return ReadPreference.PRIMARY
+    return SecondaryPreferred(max_staleness=MAX_STALENESS_SECONDS)
+
+
+def primary_reads_requested():
+    return _primary_reads.get()
+
+
+def request_primary_reads():
+    """현재 요청의 읽기를 프라이머리로 고정, reset_read_routing에 넘길 토큰 반환"""
+    return _primary_reads.set(True)
+
+
+def reset_read_routing(token):
+    _primary_reads.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """with 블록 안의 읽기 전용 조회를 프라이머리로"""
+    token = request_primary_reads()
+    try:
+        yield
+    finally:
+        reset_read_routing(token)
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """서버(주소)별 연결 풀 사용량 집계"""
+    def __init__(self):
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _update(self, address, **changes):
+        with self._lock:
+            stats = self._stats.setdefault(f"{address[0]}:{address[1]}", {
+                "open": 0, "in_use": 0, "max_in_use": 0, "checkouts": 0,
+                "checkout_failures": 0, "total_wait_ms": 0.0, "max_wait_ms": 0.0, "cleared": 0
+            })
+            for key, delta in changes.items():
+                stats[key] += delta
+            stats["max_in_use"] = max(stats["max_in_use"], stats["in_use"])
+            return stats
+
+    def _wait_ms(self, event):
+        # pymongo 4.7+에서 체크아웃 대기 시간(초) 제공
+        return (getattr(event, 'duration', 0) or 0) * 1000
+
+    def connection_created(self, event):
+        self._update(event.address, open=1)
+
+    def connection_closed(self, event):
+        self._update(event.address, open=-1)
+
+    def connection_checked_out(self, event):
+        wait_ms = self._wait_ms(event)
+        stats = self._update(event.address, in_use=1, checkouts=1, total_wait_ms=wait_ms)
+        with self._lock:
+            stats["max_wait_ms"] = max(stats["max_wait_ms"], wait_ms)
+
+    def connection_check_out_failed(self, event):
+        self._update(event.address, checkout_failures=1)
+
+    def connection_checked_in(self, event):
+        self._update(event.address, in_use=-1)
+
+    def pool_cleared(self, event):
+        self._update(event.address, cleared=1)
+
+    # 나머지 이벤트는 집계하지 않음
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                address: {
+                    **{key: value for key, value in s.items() if key not in ("total_wait_ms", "max_wait_ms")},
+                    "avg_wait_ms": round(s["total_wait_ms"] / s["checkouts"], 2) if s["checkouts"] else 0.0,
+                    "max_wait_ms": round(s["max_wait_ms"], 2)
+                }
+                for address, s in self._stats.items()
+            }
+
+
+class MongoConnection:
+    """프로세스 하나가 공유하는 MongoClient (연결 풀 1개) + 풀 사용량 통계
+
+    설정 (환경변수):
+    - MONGO_MAX_POOL_SIZE / MONGO_MIN_POOL_SIZE: 서버별 연결 풀 크기 (기본 20 / 0)
+    - MONGO_CONNECT_TIMEOUT_MS / MONGO_SERVER_SELECTION_TIMEOUT_MS / MONGO_SOCKET_TIMEOUT_MS
+    - MONGO_WAIT_QUEUE_TIMEOUT_MS: 풀이 가득 찼을 때 연결을 기다리는 최대 시간
+    - MONGO_READ_PREFERENCE: 기본 읽기 대상 (기본 primary)
+    """
+    def __init__(self, uri=None, **overrides):
+        self.uri = uri or os.getenv('MONGODB_URI')
+        self.listener = PoolStatsListener()
+        options = {
+            "maxPoolSize": int(os.getenv('MONGO_MAX_POOL_SIZE', 20)),
+            "minPoolSize": int(os.getenv('MONGO_MIN_POOL_SIZE', 0)),
+            "connectTimeoutMS": int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 5000)),
+            "serverSelectionTimeoutMS": int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 10000)),
+            "readPreference": os.getenv('MONGO_READ_PREFERENCE', 'primary'),
+        }
+        for name, env in (("socketTimeoutMS", 'MONGO_SOCKET_TIMEOUT_MS'),
+                          ("waitQueueTimeoutMS", 'MONGO_WAIT_QUEUE_TIMEOUT_MS')):
+            if os.getenv(env):
+                options[name] = int(os.getenv(env))
+        options.update(overrides)
+        self.options = options
+        self.client = MongoClient(self.uri, tlsCAFile=certifi.where(),
+                                  event_listeners=[self.listener], **options)
+
+    def stats(self):
+        """풀 설정과 서버별 연결 수/사용 중/대기 시간"""
+        return {
+            "max_pool_size": self.options["maxPoolSize"],
+            "min_pool_size": self.options["minPoolSize"],
+            "read_preference": self.options["readPreference"],
+            "replica_reads": REPLICA_READS,
+            "max_staleness_seconds": MAX_STALENESS_SECONDS,
+            "servers": self.listener.stats()
+        }
+
+
+_shared_connection = None
+_shared_lock = threading.Lock()
+
+
+def get_mongo_connection():
+    """프로세스 전체에서 공유하는 MongoConnection 반환"""
+    global _shared_connection
+    with _shared_lock:
+        if _shared_connection is None:
+            _shared_connection = MongoConnection()
+        return _shared_connection
+
+
+def get_mongo_client():
+    """프로세스 전체에서 공유하는 MongoClient 반환"""
+    return get_mongo_connection().client
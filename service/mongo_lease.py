@@ -0,0 +1,94 @@
+import datetime
+import os
+import socket
+import threading
+import uuid
+from contextlib import contextmanager
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+
+def default_owner():
+    """프로세스 식별자 (호스트:PID:임의값)"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class MongoLease:
+    """MongoDB 문서 하나로 만든 만료 시간 있는 잠금 (여러 프로세스/서버 공용)
+
+    leases 컬렉션 문서: {_id: 이름, owner, acquired_at, expires_at}
+    - 비어 있거나 만료됐거나 내가 가진 잠금만 find_one_and_update로 가져옴
+    - 다른 소유자가 유효한 잠금을 갖고 있으면 upsert가 _id 중복으로 실패 -> 획득 실패
+    - 소유자가 죽어도 ttl이 지나면 다른 프로세스가 가져갈 수 있음
+    """
+    def __init__(self, collection, name, ttl, owner=None):
+        self.collection = collection
+        self.name = name
+        self.ttl = ttl
+        self.owner = owner or default_owner()
+
+    def acquire(self):
+        """잠금 획득, 성공 여부 반환 (이미 내가 갖고 있으면 다시 획득)"""
+        now = datetime.datetime.now()
+        try:
+            doc = self.collection.find_one_and_update(
+                {"_id": self.name, "$or": [
+                    {"owner": self.owner},
+                    {"expires_at": {"$lte": now}}
+                ]},
+                {"$set": {"owner": self.owner, "acquired_at": now,
+                          "expires_at": now + datetime.timedelta(seconds=self.ttl)}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError:
+            return False
+        return doc.get("owner") == self.owner
+
+    def renew(self):
+        """보유 중인 잠금 연장 (다른 소유자에게 넘어갔으면 False)"""
+        now = datetime.datetime.now()
+        result = self.collection.update_one(
+            {"_id": self.name, "owner": self.owner},
+            {"$set": {"expires_at": now + datetime.timedelta(seconds=self.ttl)}}
+        )
+        return result.matched_count == 1
+
+    def release(self):
+        """보유 중인 잠금 해제 (바로 다른 프로세스가 가져갈 수 있게 만료 처리)"""
+        self.collection.update_one(
+            {"_id": self.name, "owner": self.owner},
+            {"$set": {"expires_at": datetime.datetime.now()}}
+        )
+
+    def holder(self):
+        """현재 잠금 문서 (없으면 None)"""
+        return self.collection.find_one({"_id": self.name})
+
+    @contextmanager
+    def hold(self):
+        """with 블록 동안 잠금 유지 (ttl/3마다 연장), 획득 여부를 넘겨줌
+
+        with lease.hold() as acquired:
+            if acquired: ...
+        """
+        if not self.acquire():
+            yield False
+            return
+
+        stop = threading.Event()
+
+        def heartbeat():
+            while not stop.wait(self.ttl / 3):
+                if not self.renew():
+                    print(f"잠금 연장 실패 - {self.name}")
+                    return
+
+        thread = threading.Thread(target=heartbeat, daemon=True)
+        thread.start()
+        try:
+            yield True
+        finally:
+            stop.set()
+            thread.join()
+            self.release()
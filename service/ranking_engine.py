@@ -0,0 +1,191 @@
+import bisect
+import heapq
+import threading
+import time
+from region_store import FEELINGS
+
+from dotenv import load_dotenv
+import os
+load_dotenv()
+
+# 랭킹 응답에 담는 지역 수
+TOP_N = 20
+# 보통이 1위일 때 기준 온도 (가까운 순)
+COMFORT_TEMP = 20
+
+
+class RankingEngine:
+    """전국 시군구 랭킹용 정렬 색인 (투표수 / 온도)
+
+    - 처음 조회 시 regions 컬렉션을 한 번 읽어 정렬 색인 생성
+    - 투표/온도 저장 시 바뀐 시군구만 색인에서 빼고 다시 삽입
+    - 온도 색인 하나로 높은 순/낮은 순/COMFORT_TEMP에 가까운 순을 모두 제공
+    - 다른 워커/서버의 투표·온도 저장은 version(DataVersion)에서 다른 프로세스의 세대 번호 증가를
+      확인하면 다시 읽어 반영 (세대 번호를 올리지 않는 manage.py 등의 변경은 RANKING_RELOAD_SECONDS마다)
+    같은 값끼리는 처음 읽은 문서 순서를 유지 (기존 정렬 결과와 동일)
+    """
+    def __init__(self, store, reload_seconds=None, version=None):
+        self.store = store
+        self.version = version
+        self.reload_seconds = reload_seconds or float(os.getenv('RANKING_RELOAD_SECONDS', 600))
+        self._lock = threading.Lock()
+        self._loaded_at = None
+        self._loaded_changes = None     # 읽을 때의 version.external_changes()
+        self._entries = {}      # _id -> {province, region, temp, code, votes, totals, seq}
+        self._ids = {}          # (광역시/도, 시군구) -> _id
+        self._vote_index = []   # (-투표수, seq, _id)
+        self._temp_index = []   # (온도, seq, _id) - 온도 있는 시군구만
+
+    # 색인 관리
+    def _vote_key(self, doc_id, entry):
+        return (-entry['votes'], entry['seq'], doc_id)
+
+    def _temp_key(self, doc_id, entry):
+        return (entry['temp'], entry['seq'], doc_id)
+
+    def _remove(self, sorted_list, key):
+        i = bisect.bisect_left(sorted_list, key)
+        if i < len(sorted_list) and sorted_list[i] == key:
+            del sorted_list[i]
+
+    def _index(self, doc_id, entry):
+        bisect.insort(self._vote_index, self._vote_key(doc_id, entry))
+        if entry['temp'] is not None:
+            bisect.insort(self._temp_index, self._temp_key(doc_id, entry))
+
+    def _unindex(self, doc_id, entry):
+        self._remove(self._vote_index, self._vote_key(doc_id, entry))
+        if entry['temp'] is not None:
+            self._remove(self._temp_index, self._temp_key(doc_id, entry))
+
+    def _totals_from_doc(self, doc):
+        return {feeling: (doc.get(feeling) or [0])[0] for feeling in FEELINGS}
+
+    def load(self):
+        """regions 컬렉션 전체를 읽어 색인 재생성"""
+        # 읽는 도중 다른 프로세스가 바꾼 내용은 다음 조회 때 다시 읽도록 먼저 기록
+        changes = self.version.external_changes() if self.version else None
+        projection = {"province": 1, "name": 1, "temperature": 1, "code": 1,
+                      "hot": {"$slice": 1}, "normal": {"$slice": 1}, "cold": {"$slice": 1}}
+        entries = {}
+        ids = {}
+        for seq, doc in enumerate(self.store.find({}, projection)):
+            totals = self._totals_from_doc(doc)
+            entries[doc['_id']] = {
+                'province': doc['province'],
+                'region': doc['name'],
+                'temp': doc.get('temperature', None),
+                'code': doc.get('code', 0),
+                'totals': totals,
+                'votes': max(totals.values()),
+                'seq': seq,
+            }
+            # 같은 이름이 중복된 경우 update_one과 같이 먼저 나온 문서 기준
+            ids.setdefault((doc['province'], doc['name']), doc['_id'])
+
+        with self._lock:
+            self._entries = entries
+            self._ids = ids
+            self._vote_index = sorted(self._vote_key(i, e) for i, e in entries.items())
+            self._temp_index = sorted(
+                self._temp_key(i, e) for i, e in entries.items() if e['temp'] is not None
+            )
+            self._loaded_at = time.monotonic()
+            self._loaded_changes = changes
+
+    def invalidate(self):
+        """다음 조회 때 전체를 다시 읽도록 표시 (임의 데이터 생성 등 대량 변경 후)"""
+        with self._lock:
+            self._loaded_at = None
+
+    def _ensure_loaded(self):
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at >= self.reload_seconds:
+            self.load()
+        elif self.version and self.version.external_changes() != self._loaded_changes:
+            self.load()
+
+    def _update(self, doc_id, **changes):
+        entry = self._entries.get(doc_id)
+        if entry is None:
+            return
+        self._unindex(doc_id, entry)
+        entry.update(changes)
+        entry['votes'] = max(entry['totals'].values())
+        self._index(doc_id, entry)
+
+    # 변경 반영
+    def update_votes(self, doc):
+        """투표 후 갱신된 시군구 문서(find_one_and_update 결과) 반영"""
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            self._update(doc['_id'], totals=self._totals_from_doc(doc))
+
+    def add_votes(self, province, name, counts):
+        """시군구 총 투표수에 {feeling: 증가량} 반영 (일괄 투표용)"""
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            doc_id = self._ids.get((province, name))
+            entry = self._entries.get(doc_id)
+            if entry is None:
+                return
+            totals = dict(entry['totals'])
+            for feeling, count in counts.items():
+                totals[feeling] = totals.get(feeling, 0) + count
+            self._update(doc_id, totals=totals)
+
+    def update_temperatures(self, temps):
+        """{_id: 기온} 반영 (온도 갱신 후)"""
+        if self._loaded_at is None:
+            return
+        with self._lock:
+            for doc_id, temp in temps.items():
+                self._update(doc_id, temp=temp)
+
+    # 조회
+    def _row(self, doc_id):
+        entry = self._entries[doc_id]
+        return {
+            'province': entry['province'],
+            'region': entry['region'],
+            'votes': entry['votes'],
+            'temp': entry['temp'],
+            'code': entry['code']
+        }
+
+    def _descending_temps(self, end):
+        """_temp_index[:end]를 높은 온도부터 (같은 온도는 seq 순)"""
+        i = end
+        while i > 0:
+            j = i - 1
+            while j > 0 and self._temp_index[j - 1][0] == self._temp_index[i - 1][0]:
+                j -= 1
+            yield from self._temp_index[j:i]
+            i = j
+
+    def _temp_order(self, feeling):
+        if feeling == 'hot':
+            return self._descending_temps(len(self._temp_index))
+        if feeling == 'cold':
+            return iter(self._temp_index)
+        # 기준 온도 아래쪽(내림차순)과 위쪽(오름차순)을 거리 순으로 병합
+        split = bisect.bisect_left(self._temp_index, (COMFORT_TEMP,))
+        return heapq.merge(
+            self._descending_temps(split),
+            iter(self._temp_index[split:]),
+            key=lambda item: (abs(item[0] - COMFORT_TEMP), item[1])
+        )
+
+    def top(self, feeling, limit=TOP_N):
+        """(투표수 상위, feeling 기준 온도 상위) 시군구 목록"""
+        self._ensure_loaded()
+        with self._lock:
+            vote_top = [self._row(doc_id) for _, _, doc_id in self._vote_index[:limit]]
+            temp_top = []
+            for _, _, doc_id in self._temp_order(feeling):
+                if len(temp_top) >= limit:
+                    break
+                temp_top.append(self._row(doc_id))
+        return vote_top, temp_top
@@ -0,0 +1,304 @@
+import atexit
+import random
+import threading
+import time
+import zlib
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from dotenv import load_dotenv
+import os
+load_dotenv()
+
+# 추천 문서의 항목 종류 (recommendations 문서의 배열 필드)
+ITEM_TYPES = ('clothes', 'food')
+# 가중치 추천 비율 (나머지는 균등 무작위 - 덜 알려진 항목도 노출되도록)
+WEIGHTED_RATIO = 0.9
+# 이미 본 항목이 뽑혔을 때 다시 뽑는 최대 횟수 (넘으면 남은 항목만 모아서 선택)
+MAX_REDRAWS = 8
+
+
+def recommendation_id(feeling):
+    """감정(덥다/춥다/보통)별 추천 문서 _id"""
+    return f"{feeling}_추천"
+
+
+class FenwickTree:
+    """항목별 가중치 누적합 트리 - 가중치 변경/누적합 위치 찾기 모두 O(log n)"""
+    def __init__(self, weights):
+        self.size = len(weights)
+        self._tree = [0.0] * (self.size + 1)
+        for i, weight in enumerate(weights, 1):
+            self._tree[i] += weight
+            parent = i + (i & -i)
+            if parent <= self.size:
+                self._tree[parent] += self._tree[i]
+        self.total = sum(weights)
+
+    def add(self, index, delta):
+        self.total += delta
+        i = index + 1
+        while i <= self.size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def find(self, value):
+        """누적합이 value를 넘는 첫 항목 위치"""
+        position = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = position + step
+            if nxt <= self.size and self._tree[nxt] <= value:
+                position = nxt
+                value -= self._tree[nxt]
+            step >>= 1
+        # 부동소수점 오차로 끝을 넘는 경우 마지막 항목
+        return min(position, self.size - 1)
+
+
+class ItemSampler:
+    """감정 하나의 옷 또는 음식 목록 - 가중치 (likes+1)/(shown_count+1)로 추천"""
+    def __init__(self, items):
+        self._items = items
+        self.names = [item["name"] for item in items]
+        self.likes = [item.get("likes", 0) for item in items]
+        self.shown = [item.get("shown_count", 0) for item in items]
+        # 같은 이름이 중복된 경우 먼저 나온 항목 기준
+        self.positions = {}
+        for i, name in enumerate(self.names):
+            self.positions.setdefault(name, i)
+        # 목록 서명 - 세션별 비트셋의 항목 위치가 아직 유효한지 확인용 (프로세스 간 동일)
+        self.signature = zlib.crc32("\n".join(self.names).encode())
+        self.tree = FenwickTree([self._weight(i) for i in range(len(self.names))])
+
+    def __len__(self):
+        return len(self.names)
+
+    def _weight(self, i):
+        return (self.likes[i] + 1) / (self.shown[i] + 1)
+
+    def add(self, i, likes=0, shown=0):
+        before = self._weight(i)
+        self.likes[i] += likes
+        self.shown[i] += shown
+        self.tree.add(i, self._weight(i) - before)
+
+    def item(self, i):
+        return {**self._items[i], "likes": self.likes[i], "shown_count": self.shown[i]}
+
+    def items(self):
+        return [self.item(i) for i in range(len(self.names))]
+
+    def sample(self, excluded=0):
+        """excluded(이미 본 위치의 비트셋)를 뺀 항목 중 하나의 위치, 모두 봤으면 None"""
+        if not self.names or bin(excluded).count("1") >= len(self.names):
+            return None
+
+        weighted = random.random() < WEIGHTED_RATIO
+        # 본 항목이 적으면 몇 번 다시 뽑는 것으로 충분
+        for _ in range(MAX_REDRAWS):
+            if weighted:
+                i = self.tree.find(random.uniform(0, self.tree.total))
+            else:
+                i = random.randrange(len(self.names))
+            if not excluded >> i & 1:
+                return i
+
+        # 대부분 본 경우 남은 항목만 모아서 선택
+        candidates = [i for i in range(len(self.names)) if not excluded >> i & 1]
+        if not candidates:
+            return None
+        if not weighted:
+            return random.choice(candidates)
+        return random.choices(candidates, weights=[self._weight(i) for i in candidates])[0]
+
+
+class RecommendationEngine:
+    """감정별 옷/음식 추천 (메모리 가중치 트리 + 좋아요/노출 수 모아서 저장)
+
+    - 감정별 추천 문서는 처음 사용할 때 한 번 읽어 항목별 가중치 트리 생성
+      (다른 프로세스의 변경은 RECOMMEND_RELOAD_SECONDS마다 다시 읽어 반영)
+    - 추천 1회는 O(log n)이고 DB에 쓰지 않음
+    - 좋아요(likes)/노출 수(shown_count) 증가는 메모리에 모았다가 RECOMMEND_FLUSH_SECONDS마다
+      감정 문서당 $inc 1번(bulk_write)으로 저장 (저장 실패 시 다음 주기에 다시 시도)
+    - 목록 조회(items)는 아직 저장 전인 증가량까지 반영된 값
+      (다시 읽기/좋아요/저장 때마다 감정별 generation이 올라가므로 응답 캐시 키로 사용)
+    - 세션별로 이번 라운드에 보여준 항목은 sessions(RecommendationSessions)에 기록해서 제외
+    """
+    def __init__(self, collection, sessions=None, flush_seconds=None, reload_seconds=None):
+        self.collection = collection
+        self.sessions = sessions
+        self.flush_seconds = flush_seconds or float(os.getenv('RECOMMEND_FLUSH_SECONDS', 2))
+        self.reload_seconds = reload_seconds or float(os.getenv('RECOMMEND_RELOAD_SECONDS', 60))
+        self._samplers = {}     # 감정 -> {항목 종류: ItemSampler}
+        self._loaded_at = {}    # 감정 -> 읽은 시각
+        self._generations = {}  # 감정 -> 목록이 바뀐 횟수
+        self._pending = {}      # (감정, 항목 종류, 이름) -> {필드: 저장 전 증가량}
+        self._flushing = {}     # 저장 중인 증가량 (저장이 끝나기 전에 다시 읽은 값에도 반영)
+        self._lock = threading.Lock()
+        self._thread = None
+
+    # 항목 읽기
+    def load(self, feeling):
+        """추천 문서를 읽어 가중치 트리 생성, 문서가 없으면 False
+
+        저장한 좋아요/노출 수가 줄어 보이지 않도록 프라이머리에서 읽음 (감정별로 가끔 한 번이라 부담 적음)
+        """
+        doc = self.collection.find_one({"_id": recommendation_id(feeling)})
+        if not doc:
+            return False
+
+        samplers = {item_type: ItemSampler(doc.get(item_type, [])) for item_type in ITEM_TYPES}
+        with self._lock:
+            # 아직 저장하지 않은 증가량은 다시 읽은 값에 더해서 유지
+            for changes in (self._flushing, self._pending):
+                for (pending_feeling, item_type, name), counts in changes.items():
+                    sampler = samplers[item_type] if pending_feeling == feeling else None
+                    if sampler and name in sampler.positions:
+                        sampler.add(sampler.positions[name], likes=counts.get("likes", 0),
+                                    shown=counts.get("shown_count", 0))
+            self._samplers[feeling] = samplers
+            self._loaded_at[feeling] = time.monotonic()
+            self._bump(feeling)
+        return True
+
+    def invalidate(self, feeling=None):
+        """다음 추천 때 다시 읽도록 표시 (feeling이 없으면 전체)"""
+        with self._lock:
+            if feeling is None:
+                self._loaded_at.clear()
+            else:
+                self._loaded_at.pop(feeling, None)
+
+    def _ensure_loaded(self, feeling):
+        loaded_at = self._loaded_at.get(feeling)
+        if loaded_at is None or time.monotonic() - loaded_at >= self.reload_seconds:
+            return self.load(feeling)
+        return True
+
+    def _bump(self, feeling):
+        self._generations[feeling] = self._generations.get(feeling, 0) + 1
+
+    def _add_pending(self, key, field, count):
+        counts = self._pending.setdefault(key, {})
+        counts[field] = counts.get(field, 0) + count
+
+    # 조회
+    def exists(self, feeling):
+        """추천 문서가 있는 감정인지"""
+        return self._ensure_loaded(feeling)
+
+    def generation(self, feeling):
+        """items(feeling)이 바뀔 때마다 올라가는 번호 (추천 1회의 노출 수 증가는 저장할 때 반영)"""
+        return self._generations.get(feeling, 0)
+
+    def items(self, feeling):
+        """{항목 종류: 항목 목록} (저장 전 좋아요/노출 수 포함), 문서가 없으면 None"""
+        if not self._ensure_loaded(feeling):
+            return None
+        with self._lock:
+            return {item_type: sampler.items() for item_type, sampler in self._samplers[feeling].items()}
+
+    # 추천
+    def recommend(self, feeling, item_type, session_id=None):
+        """세션이 이번 라운드에 아직 안 본 항목 하나 추천 (노출 수 1 증가), 다 봤으면 None"""
+        if item_type not in ITEM_TYPES or not self._ensure_loaded(feeling):
+            return None
+
+        sampler = self._samplers[feeling][item_type]
+        shown = 0
+        if self.sessions and session_id:
+            shown = self.sessions.shown(session_id, feeling, item_type, sampler.signature)
+
+        with self._lock:
+            i = sampler.sample(shown)
+            if i is None:
+                return None
+            sampler.add(i, shown=1)
+            self._add_pending((feeling, item_type, sampler.names[i]), "shown_count", 1)
+            chosen = sampler.item(i)
+
+        if self.sessions and session_id:
+            self.sessions.mark(session_id, feeling, item_type, sampler.signature, shown | 1 << i)
+        self._start()
+        return chosen
+
+    def add_like(self, feeling, item_type, name):
+        """좋아요 1건 반영 (저장은 다음 주기에), 없는 항목이면 False"""
+        if item_type not in ITEM_TYPES or not self._ensure_loaded(feeling):
+            return False
+
+        with self._lock:
+            sampler = self._samplers[feeling][item_type]
+            if name not in sampler.positions:
+                return False
+            sampler.add(sampler.positions[name], likes=1)
+            self._add_pending((feeling, item_type, name), "likes", 1)
+            self._bump(feeling)
+
+        self._start()
+        return True
+
+    # 증가량 저장
+    def _start(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is not None:
+                    return
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            # 종료 시 남은 증가량 저장
+            atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_seconds)
+            self.flush()
+
+    def flush(self):
+        """모인 좋아요/노출 수를 감정 문서당 $inc 1번으로 저장, 저장한 항목 수 반환"""
+        with self._lock:
+            if self._flushing:
+                return 0    # 이전 저장이 아직 진행 중
+            pending, self._pending = self._pending, {}
+            self._flushing = pending
+        if not pending:
+            return 0
+
+        by_feeling = {}
+        for key, count in pending.items():
+            by_feeling.setdefault(key[0], []).append(key)
+
+        feelings = list(by_feeling)
+        requests = []
+        for feeling in feelings:
+            inc = {}
+            array_filters = []
+            for n, (_, item_type, name) in enumerate(by_feeling[feeling]):
+                for field, count in pending[(feeling, item_type, name)].items():
+                    inc[f"{item_type}.$[item{n}].{field}"] = count
+                array_filters.append({f"item{n}.name": name})
+            requests.append(UpdateOne({"_id": recommendation_id(feeling)}, {"$inc": inc},
+                                      array_filters=array_filters))
+
+        failed = set()
+        try:
+            self.collection.bulk_write(requests, ordered=False)
+        except BulkWriteError as e:
+            failed = {feelings[error["index"]] for error in e.details.get("writeErrors", [])}
+            print(f"추천 좋아요/노출 수 저장 일부 실패: {sorted(failed)}")
+        except PyMongoError as e:
+            failed = set(feelings)
+            print(f"추천 좋아요/노출 수 저장 실패: {e}")
+
+        # 실패한 문서의 증가량은 다음 주기에 다시 저장
+        with self._lock:
+            self._flushing = {}
+            for feeling in feelings:
+                self._bump(feeling)
+            for key, counts in pending.items():
+                if key[0] in failed:
+                    for field, count in counts.items():
+                        self._add_pending(key, field, count)
+
+        return len(pending) - sum(1 for key in pending if key[0] in failed)
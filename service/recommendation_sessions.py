@@ -0,0 +1,112 @@
+import datetime
+import threading
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+import os
+load_dotenv()
+
+
+class MemorySessionBackend:
+    """프로세스 메모리에 저장 - 최근 사용한 max_sessions개 세션만 유지 (LRU + TTL)"""
+    def __init__(self, max_sessions, ttl):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()  # 세션 id -> (만료 시각, {키: (목록 서명, 비트셋)})
+        self._lock = threading.Lock()
+
+    def get(self, session_id, key):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return None
+            expires_at, shown = entry
+            if expires_at <= time.monotonic():
+                del self._sessions[session_id]
+                return None
+            return shown.get(key)
+
+    def set(self, session_id, key, signature, bits):
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            shown = entry[1] if entry and entry[0] > time.monotonic() else {}
+            shown[key] = (signature, bits)
+            self._sessions[session_id] = (time.monotonic() + self.ttl, shown)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+
+class MongoSessionBackend:
+    """MongoDB에 저장 - 여러 워커/서버가 같은 세션 상태 공유
+
+    recommend_sessions 문서: {_id: 세션 id, shown: {키: {signature, bits}}, expires_at}
+    (expires_at TTL 인덱스로 만료된 세션 자동 삭제)
+    """
+    def __init__(self, collection, ttl):
+        self.collection = collection
+        self.ttl = ttl
+
+    def get(self, session_id, key):
+        doc = self.collection.find_one(
+            {"_id": session_id, "expires_at": {"$gt": datetime.datetime.now()}},
+            {f"shown.{key}": 1}
+        )
+        entry = (doc or {}).get("shown", {}).get(key)
+        if not entry:
+            return None
+        return entry["signature"], int.from_bytes(entry["bits"], "little")
+
+    def set(self, session_id, key, signature, bits):
+        self.collection.update_one(
+            {"_id": session_id},
+            {"$set": {
+                f"shown.{key}": {"signature": signature,
+                                 "bits": bits.to_bytes((bits.bit_length() + 7) // 8, "little")},
+                "expires_at": datetime.datetime.now() + datetime.timedelta(seconds=self.ttl)
+            }},
+            upsert=True
+        )
+
+
+class RecommendationSessions:
+    """사용자(세션)별로 이번 라운드에 이미 보여준 추천 항목
+
+    - 감정/항목 종류마다 항목 위치를 비트 번호로 쓰는 비트셋 하나 (항목 100개면 13바이트)
+    - 항목 목록이 바뀌면(서명 불일치) 새 라운드로 시작
+    - RECOMMEND_SESSION_TTL_SECONDS 동안 추천을 받지 않은 세션은 새 라운드로 시작
+    - 저장소: 기본은 프로세스 메모리(최대 RECOMMEND_SESSION_MAX개 세션),
+      RECOMMEND_SESSION_BACKEND=mongo면 여러 워커가 공유하는 MongoDB
+    """
+    def __init__(self, backend):
+        self.backend = backend
+        self.ttl = backend.ttl
+
+    @staticmethod
+    def _key(feeling, item_type):
+        return f"{feeling}:{item_type}"
+
+    def shown(self, session_id, feeling, item_type, signature):
+        """이번 라운드에 보여준 항목 비트셋 (목록이 바뀌었으면 0)"""
+        entry = self.backend.get(session_id, self._key(feeling, item_type))
+        if entry is None or entry[0] != signature:
+            return 0
+        return entry[1]
+
+    def mark(self, session_id, feeling, item_type, signature, bits):
+        self.backend.set(session_id, self._key(feeling, item_type), signature, bits)
+
+    def reset(self, session_id, feeling, item_types):
+        """feeling의 새 라운드 시작 (보여준 항목 초기화)"""
+        for item_type in item_types:
+            self.backend.set(session_id, self._key(feeling, item_type), None, 0)
+
+
+def create_recommendation_sessions(db):
+    """환경변수 설정에 맞는 저장소로 RecommendationSessions 생성"""
+    ttl = float(os.getenv('RECOMMEND_SESSION_TTL_SECONDS', 1800))
+    if os.getenv('RECOMMEND_SESSION_BACKEND', 'memory').lower() == 'mongo':
+        backend = MongoSessionBackend(db.recommend_sessions, ttl)
+    else:
+        backend = MemorySessionBackend(int(os.getenv('RECOMMEND_SESSION_MAX', 10000)), ttl)
+    return RecommendationSessions(backend)
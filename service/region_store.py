@@ -0,0 +1,87 @@
+from pymongo import UpdateOne, ReplaceOne
+from index_registry import ensure_collection_indexes
+
+# 시군구 문서의 투표 배열: [총합, 상세1..상세5]
+FEELINGS = ('hot', 'normal', 'cold')
+ARRAY_SIZE = 6
+
+# 광역시/도 목록 (지도/랭킹 출력 순서)
+PROVINCES = ['서울특별시', '부산광역시', '강원도', '대구광역시', '인천광역시',
+             '광주광역시', '대전광역시', '울산광역시', '세종특별자치시', '경기도',
+             '충청북도', '충청남도', '전라북도', '전라남도', '경상북도', '경상남도', '제주특별자치도']
+
+
+class RegionStore:
+    """시군구 문서 저장소
+
+    모든 시군구를 regions 컬렉션 하나에 저장하고 province 필드로 광역시/도를 구분
+    (이전 구조: 광역시/도별 컬렉션 17개 - migrate_from_legacy로 이전)
+    """
+    def __init__(self, db):
+        self.db = db
+        self.collection = db.regions
+
+    def ensure_indexes(self):
+        """시군구 조회/관측소 코드 조회용 인덱스 생성 (이미 있으면 그대로)"""
+        ensure_collection_indexes(self.collection)
+
+    def region_filter(self, province, name):
+        return {"province": province, "name": name}
+
+    def find(self, query=None, projection=None):
+        return self.collection.find(query or {}, projection)
+
+    def find_by_province(self, province, projection=None):
+        return self.collection.find({"province": province}, projection)
+
+    def find_one(self, province, name, projection=None):
+        return self.collection.find_one(self.region_filter(province, name), projection)
+
+    def find_one_and_update(self, province, name, update, **kwargs):
+        return self.collection.find_one_and_update(self.region_filter(province, name), update, **kwargs)
+
+    def bulk_write(self, requests):
+        return self.collection.bulk_write(requests, ordered=False)
+
+    def aggregate(self, pipeline):
+        return self.collection.aggregate(pipeline)
+
+    def source_stages(self, provinces=None):
+        """집계 파이프라인 시작 스테이지 - 지정한 광역시/도의 시군구만 선택"""
+        if provinces is None or set(provinces) >= set(PROVINCES):
+            return []
+        return [{"$match": {"province": {"$in": list(provinces)}}}]
+
+    def legacy_collections(self):
+        """아직 남아 있는 광역시/도별 이전 컬렉션 목록"""
+        existing = set(self.db.list_collection_names())
+        return [province for province in PROVINCES if province in existing]
+
+    def migrate_from_legacy(self, overwrite=False, drop_legacy=False):
+        """광역시/도별 컬렉션의 시군구 문서를 regions 컬렉션으로 이전
+
+        기존 _id를 그대로 사용하므로 여러 번 실행해도 중복되지 않음
+        overwrite=False면 이미 이전된 문서(이후 투표 포함)는 건드리지 않음
+        반환: {광역시/도: 이전한 문서 수}
+        """
+        self.ensure_indexes()
+        migrated = {}
+
+        for province in self.legacy_collections():
+            requests = []
+            for doc in self.db[province].find():
+                doc = {**doc, "province": province}
+                if overwrite:
+                    requests.append(ReplaceOne({"_id": doc["_id"]}, doc, upsert=True))
+                else:
+                    fields = {key: value for key, value in doc.items() if key != "_id"}
+                    requests.append(UpdateOne({"_id": doc["_id"]}, {"$setOnInsert": fields}, upsert=True))
+
+            if requests:
+                self.bulk_write(requests)
+            migrated[province] = len(requests)
+
+            if drop_legacy:
+                self.db[province].drop()
+
+        return migrated
@@ -0,0 +1,76 @@
+import gzip
+import hashlib
+import threading
+from cache_service import TTLCache
+from mongo_connection import primary_reads_requested
+
+from dotenv import load_dotenv
+import os
+load_dotenv()
+
+try:
+    import brotli
+except ImportError:     # brotli 패키지가 없으면 gzip만 제공
+    brotli = None
+
+# 지원하는 압축 방식 (선호 순서)
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+
+
+class CachedPayload:
+    """직렬화한 응답 본문 + ETag 값(따옴표 없이) + 압축본 (압축 방식별로 처음 요청될 때 한 번만 압축)"""
+    def __init__(self, body, etag):
+        self.body = body
+        self.etag = etag
+        self._encoded = {}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding):
+        with self._lock:
+            if encoding not in self._encoded:
+                if encoding == 'br':
+                    self._encoded[encoding] = brotli.compress(self.body, quality=5)
+                else:
+                    self._encoded[encoding] = gzip.compress(self.body, compresslevel=6)
+            return self._encoded[encoding]
+
+
+class ResponseCache:
+    """JSON 조회 API의 직렬화 결과 캐시 (조건부 GET/압축 응답용)
+
+    - 캐시 키에 데이터 세대 번호(DataVersion)를 넣어서 투표/온도 저장 후에는 새로 직렬화
+    - 프라이머리에서 읽은 응답(방금 투표한 클라이언트)과 세컨더리에서 읽은 응답은 따로 보관
+    - ETag는 W/"세대 번호-본문 해시" (세컨더리 지연으로 같은 세대에 내용이 바뀌어도 구분)
+    - RESPONSE_COMPRESS_MIN_BYTES보다 작은 본문은 압축하지 않음
+    """
+    def __init__(self, version, dumps, max_size=None, ttl=None, min_compress_size=None):
+        self.version = version
+        self.dumps = dumps
+        self.cache = TTLCache(
+            max_size=max_size or int(os.getenv('RESPONSE_CACHE_MAX_SIZE', 256)),
+            ttl=ttl or float(os.getenv('CACHE_TTL_SECONDS', 30))
+        )
+        self.min_compress_size = min_compress_size or int(os.getenv('RESPONSE_COMPRESS_MIN_BYTES', 1024))
+
+    def get(self, endpoint, args, loader):
+        """현재 세대의 CachedPayload, 없으면 loader() 결과를 직렬화해서 저장"""
+        generation = self.version.current()
+        key = (endpoint, args, generation, primary_reads_requested())
+        found, payload = self.cache.get(key)
+        if found:
+            return payload
+
+        body = self.dumps(loader()).encode('utf-8')
+        etag = f"{generation}-{hashlib.sha1(body).hexdigest()[:16]}"
+        payload = CachedPayload(body, etag)
+        self.cache.set(key, payload)
+        return payload
+
+    def choose_encoding(self, payload, accepted):
+        """accepted(클라이언트가 받는 압축 방식들) 중 사용할 방식, 압축하지 않으면 None"""
+        if len(payload.body) < self.min_compress_size:
+            return None
+        for encoding in ENCODINGS:
+            if encoding in accepted:
+                return encoding
+        return None
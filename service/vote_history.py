@@ -0,0 +1,96 @@
+import datetime
+from pymongo import UpdateOne
+from region_store import FEELINGS, ARRAY_SIZE
+
+
+def to_utc(when):
+    """시각을 UTC로 (시간대 없는 값은 서버 지역 시각으로 간주)"""
+    return when.astimezone(datetime.timezone.utc)
+
+
+def bucket_hour(when=None):
+    """시각을 UTC 1시간 단위 버킷 시작 시각으로 내림 (기본값: 현재 시각)
+
+    MongoDB는 날짜를 UTC로 저장하고 TTL 인덱스도 UTC로 비교하므로 버킷 시각도 UTC로 맞춤
+    """
+    when = to_utc(when) if when else datetime.datetime.now(datetime.timezone.utc)
+    return when.replace(minute=0, second=0, microsecond=0)
+
+
+class VoteHistory:
+    """시간대별 투표 기록 (시군구 x 1시간 버킷 문서)
+
+    버킷 문서: {province, name, hour(UTC), hot_0..hot_5, normal_0..., cold_0...}
+    - 투표마다 해당 시간 버킷에 $inc (upsert) - 원본 이벤트는 저장하지 않음
+    - 시간 범위 조회는 범위에 걸친 버킷만 합산
+    - 보관 기간(VOTE_BUCKET_RETENTION_DAYS)이 지난 버킷은 TTL 인덱스로 삭제
+    """
+    def __init__(self, db):
+        self.collection = db.vote_buckets
+
+    def _increments(self, feeling, detail, incs=None):
+        incs = {} if incs is None else incs
+        for field in (f"{feeling}_{0}", f"{feeling}_{detail}"):
+            incs[field] = incs.get(field, 0) + 1
+        return incs
+
+    def record(self, province, name, feeling, detail, when=None):
+        """투표 1건을 해당 시간 버킷에 누적"""
+        hour = bucket_hour(when)
+        self.collection.update_one(
+            {"province": province, "name": name, "hour": hour},
+            {"$inc": self._increments(feeling, detail)},
+            upsert=True
+        )
+
+    def record_many(self, votes, when=None):
+        """여러 투표를 버킷별로 합쳐서 한 번에 누적
+
+        votes: (province, name, feeling, detail) 목록
+        """
+        hour = bucket_hour(when)
+        bucket_incs = {}
+        for province, name, feeling, detail in votes:
+            self._increments(feeling, detail, bucket_incs.setdefault((province, name), {}))
+
+        if bucket_incs:
+            self.collection.bulk_write([
+                UpdateOne({"province": province, "name": name, "hour": hour}, {"$inc": incs}, upsert=True)
+                for (province, name), incs in bucket_incs.items()
+            ], ordered=False)
+
+    def window_stages(self, start=None, end=None):
+        """시군구 문서의 hot/normal/cold 배열을 [start, end) 범위 버킷 합계로 바꾸는 스테이지"""
+        conditions = [
+            {"$eq": ["$province", "$$province"]},
+            {"$eq": ["$name", "$$name"]},
+        ]
+        if start:
+            conditions.append({"$gte": ["$hour", bucket_hour(start)]})
+        if end:
+            conditions.append({"$lt": ["$hour", to_utc(end)]})
+
+        group = {"_id": None}
+        for feeling in FEELINGS:
+            for i in range(ARRAY_SIZE):
+                group[f"{feeling}_{i}"] = {"$sum": f"${feeling}_{i}"}
+
+        arrays = {
+            feeling: [
+                {"$ifNull": [{"$arrayElemAt": [f"$window.{feeling}_{i}", 0]}, 0]}
+                for i in range(ARRAY_SIZE)
+            ]
+            for feeling in FEELINGS
+        }
+        return [
+            {"$lookup": {
+                "from": self.collection.name,
+                "let": {"province": "$province", "name": "$name"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$and": conditions}}},
+                    {"$group": group}
+                ],
+                "as": "window"
+            }},
+            {"$addFields": arrays}
+        ]
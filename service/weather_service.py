@@ -1,131 +1,113 @@
-import requests
 import datetime
+from pymongo import UpdateOne
 from pymongo.mongo_client import MongoClient
 import certifi
-import time
+from cache_service import CacheService
+from kma_fetcher import KmaFetcher
+from region_store import RegionStore, PROVINCES
+from ranking_engine import RankingEngine
+from event_bus import EventBus
+from mongo_lease import MongoLease
 
 from dotenv import load_dotenv
 import os
 load_dotenv()
 
 class WeatherService:
-    def __init__(self, client):
+    def __init__(self, client, cache=None, ranking=None, events=None):
         self.client = client
         self.db = client.korea_regions_db
+        self.store = RegionStore(self.db)       # 시군구 문서 (regions 컬렉션)
+        self.cache = cache or CacheService()    # DataService와 공유하는 조회 결과 캐시
+        self.ranking = ranking or RankingEngine(self.store)    # DataService와 공유하는 랭킹 색인
+        self.events = events or EventBus()      # DataService와 공유하는 /stream 변경 알림
         self.authKey = os.getenv('WEATHER_API_KEY')
-        self.collections = ['서울특별시', '부산광역시', '강원도', '대구광역시', '인천광역시', 
-                           '광주광역시', '대전광역시', '울산광역시', '세종특별자치시', '경기도',
-                           '충청북도', '충청남도', '전라북도', '전라남도', '경상북도', '경상남도', '제주특별자치도']
+        self.fetcher = KmaFetcher(self.authKey)    # 관측소 동시 조회기
+        self.provinces = PROVINCES
+        # 전체 온도 갱신은 여러 프로세스 중 잠금을 가진 한 곳에서만 실행
+        self.update_lease = MongoLease(self.db.leases, "temperature_update",
+                                       ttl=float(os.getenv('TEMP_UPDATE_LEASE_SECONDS', 120)))
     
+    def _collect_station_jobs(self, query=None):
+        """관측소 코드가 있는 시군구 문서를 {(광역시/도, _id): 코드} 형태로 수집"""
+        jobs = {}
+        names = {}
+        query = {**(query or {}), "code": {"$exists": True, "$ne": 0}}
+        for doc in self.store.find(query, {"province": 1, "name": 1, "code": 1}):
+            key = (doc["province"], doc["_id"])
+            jobs[key] = doc["code"]
+            names[key] = doc.get('name', 'Unknown')
+        return jobs, names
+
+    def _write_temperatures(self, temps, names):
+        """조회한 기온을 bulk_write 한 번으로 저장"""
+        if not temps:
+            return 0
+
+        now = datetime.datetime.now()
+        result = self.store.bulk_write([
+            UpdateOne({"_id": doc_id}, {"$set": {"temperature": temp, "temp_updated_at": now}})
+            for (province, doc_id), temp in temps.items()
+        ])
+
+        self.ranking.update_temperatures({doc_id: temp for (province, doc_id), temp in temps.items()})
+
+        # 온도가 바뀐 광역시/도의 캐시만 무효화
+        self.cache.invalidate_provinces({province for province, _ in temps})
+
+        for (province, doc_id), temp in temps.items():
+            self.events.publish('temperatures', doc_id, {
+                "province": province,
+                "region": names[(province, doc_id)],
+                "temp": temp
+            })
+        return result.matched_count
+
+    def _fetch_by_station(self, jobs, names):
+        """관측소 코드별로 한 번만 조회한 뒤 같은 코드를 쓰는 모든 시군구에 결과 분배
+
+        반환: ({(광역시/도, _id): 기온}, 실패한 시군구 수)
+        """
+        # 코드 -> 시군구 목록 (여러 지역/광역시도가 같은 관측소를 공유함)
+        station_index = {}
+        for key, code in jobs.items():
+            station_index.setdefault(code, []).append(key)
+
+        temps_by_code, errors = self.fetcher.fetch_stations(station_index)
+
+        temps = {
+            key: temp
+            for code, temp in temps_by_code.items()
+            for key in station_index[code]
+        }
+        error_count = 0
+        for code, message in errors.items():
+            for province, doc_id in station_index[code]:
+                print(f"온도 데이터 업데이트 실패 - {province} {names[(province, doc_id)]}: {message}")
+                error_count += 1
+
+        return temps, error_count
+
     def update_temperature_data(self):
         """모든 지역의 온도 데이터를 기상청 API로 가져와서 DB에 저장"""
         print("온도 데이터 업데이트 시작...")
-        updated_count = 0
-        error_count = 0
-        
-        for collection_name in self.collections:
-            collection = self.db[collection_name]
-            print(f"{collection_name} 온도 데이터 업데이트 중...")
-            
-            for doc in collection.find():
-                code = doc.get('code', 0)
-                if code == 0:
-                    continue
-                    
-                try:
-                    params = {
-                        'tm2': '0',     
-                        'stn': code,
-                        'disp':'0',         
-                        'authKey': self.authKey,
-                        'inf': 'AWS'
-                    }
-                    url = 'https://apihub.kma.go.kr/api/typ01/cgi-bin/url/nph-aws2_min'
-                    
-                    response = requests.get(url, params=params, verify=True, timeout=5)
-                    
-                    if response.status_code == 200:
-                        lines = response.text.splitlines()
-                        data_lines = [line for line in lines if line.strip() and not line.startswith("#")]
-                        
-                        if data_lines:
-                            columns = data_lines[0].split()
-                            if len(columns) > 8 and columns[8].replace('.', '').replace('-', '').isdigit():
-                                temp = float(columns[8])
-                                
-                                collection.update_one(
-                                    {"_id": doc["_id"]},
-                                    {
-                                        "$set": {
-                                            "temperature": temp,
-                                            "temp_updated_at": datetime.datetime.now()
-                                        }
-                                    }
-                                )
-                                updated_count += 1
-                    
-                    # API 호출 간격 조절
-                    time.sleep(0.1)
-                                
-                except requests.exceptions.Timeout:
-                    print(f"Timeout - {collection_name} {doc.get('name', 'Unknown')}")
-                    error_count += 1
-                    continue
-                except Exception as e:
-                    print(f"온도 데이터 업데이트 실패 - {collection_name} {doc.get('name', 'Unknown')}: {str(e)}")
-                    error_count += 1
-                    continue
-        
+        jobs, names = self._collect_station_jobs()
+
+        station_count = len(set(jobs.values()))
+        print(f"{len(jobs)}개 지역, {station_count}개 관측소 온도 조회 중 (동시 {self.fetcher.max_workers}개)...")
+        temps, error_count = self._fetch_by_station(jobs, names)
+
+        updated_count = self._write_temperatures(temps, names)
         print(f"온도 데이터 업데이트 완료: {updated_count}개 성공, {error_count}개 실패")
         return updated_count
 
     def update_temperature_data_by_region(self, province, region_name=None):
         """특정 지역의 온도 데이터만 업데이트"""
-        collection = self.db[province]
-        query = {"name": region_name} if region_name else {}
-        
-        updated_count = 0
-        for doc in collection.find(query):
-            code = doc.get('code', 0)
-            if code == 0:
-                continue
-                
-            try:
-                params = {
-                    'tm2': '0',     
-                    'stn': code,
-                    'disp':'0',         
-                    'authKey': self.authKey,
-                    'inf': 'AWS'
-                }
-                url = 'https://apihub.kma.go.kr/api/typ01/cgi-bin/url/nph-aws2_min'
-                response = requests.get(url, params=params, verify=True, timeout=5)
-                
-                if response.status_code == 200:
-                    lines = response.text.splitlines()
-                    data_lines = [line for line in lines if line.strip() and not line.startswith("#")]
-                    
-                    if data_lines:
-                        columns = data_lines[0].split()
-                        if len(columns) > 8 and columns[8].replace('.', '').replace('-', '').isdigit():
-                            temp = float(columns[8])
-                            
-                            collection.update_one(
-                                {"_id": doc["_id"]},
-                                {
-                                    "$set": {
-                                        "temperature": temp,
-                                        "temp_updated_at": datetime.datetime.now()
-                                    }
-                                }
-                            )
-                            updated_count += 1
-                            
-            except Exception as e:
-                print(f"온도 데이터 업데이트 실패 - {province} {doc.get('name', 'Unknown')}: {str(e)}")
-                continue
-        
-        return updated_count
+        query = self.store.region_filter(province, region_name) if region_name else {"province": province}
+        jobs, names = self._collect_station_jobs(query)
+
+        temps, _ = self._fetch_by_station(jobs, names)
+        return self._write_temperatures(temps, names)
     
     def should_update_temperature_data(self):
         """온도 데이터 업데이트가 필요한지 확인"""
@@ -146,30 +128,40 @@ class WeatherService:
     
         return True
 
-    def update_temperature_data_smart(self):
-        """스마트 온도 데이터 업데이트 (중복 방지)"""
-        if not self.should_update_temperature_data():
-            return 0
-    
-        # 업데이트 시작 시점 기록 (다른 요청들이 중복 실행 방지)
-        import datetime
-        self.db.system_info.update_one(
-            {"type": "last_temp_update"},
-            {"$set": {"timestamp": datetime.datetime.now(), "status": "updating"}},
-            upsert=True
-        )
-    
-        try:
-            updated_count = self.update_temperature_data()
-        
+    def update_temperature_data_smart(self, force=False):
+        """스마트 온도 데이터 업데이트 (중복 방지)
+
+        여러 프로세스 중 온도 갱신 잠금(leases.temperature_update)을 얻은 한 곳에서만 실행
+        잠금을 못 얻었거나 30분 이내에 갱신됐으면 0 반환 (force=True면 최근 갱신 여부 무시)
+        """
+        with self.update_lease.hold() as acquired:
+            if not acquired:
+                print("다른 곳에서 온도 데이터 업데이트 중. 스킵.")
+                return 0
+
+            if not force and not self.should_update_temperature_data():
+                return 0
+
+            # 업데이트 시작 기록 (timestamp는 마지막 완료 시각으로 유지)
+            self.db.system_info.update_one(
+                {"type": "last_temp_update"},
+                {"$set": {"status": "updating", "started_at": datetime.datetime.now()}},
+                upsert=True
+            )
+
+            try:
+                updated_count = self.update_temperature_data()
+            except Exception:
+                # 실패 시 완료 시각은 그대로 두어 다음 요청에서 다시 시도
+                self.db.system_info.update_one(
+                    {"type": "last_temp_update"},
+                    {"$set": {"status": "failed"}}
+                )
+                raise
+
             # 업데이트 완료 기록
             self.db.system_info.update_one(
                 {"type": "last_temp_update"},
                 {"$set": {"timestamp": datetime.datetime.now(), "status": "completed"}}
             )
-        
             return updated_count
-        except Exception as e:
-            # 실패 시 상태 초기화
-            self.db.system_info.delete_one({"type": "last_temp_update"})
-            raise e
\ No newline at end of file
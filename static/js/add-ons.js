@@ -7,8 +7,7 @@ var currentClothes = null;
 var currentFood = null;
 var likedItems = new Set();
 var isHandlingClick = false;
-const seenClothes = new Set();
-const seenFood = new Set();
+const recommendRounds = new Set(); // 이번 페이지에서 라운드를 시작한 감정
 
 // 랭킹 팝업
 function openRankingPopup() {
@@ -459,32 +458,22 @@ function closeRecommendPopup() {
 }
 
 // 추천 데이터 가져오기
+// 서버가 세션별로 이번 라운드에 본 항목을 빼고 가중치에 따라 옷/음식을 하나씩 골라줌
 function fetchRecommendation(feelingKorean) {
-  fetch("/api/recommendations/" + encodeURIComponent(feelingKorean))
+  // 페이지를 연 뒤 감정별 첫 추천이면 새 라운드 시작
+  var url = "/api/recommend/" + encodeURIComponent(feelingKorean);
+  if (!recommendRounds.has(feelingKorean)) {
+    url += "?new_round=1";
+  }
+
+  fetch(url)
     .then(function (response) {
       return response.json();
     })
     .then(function (data) {
-      // 클라이언트에서 본 적 없는 항목 중 랜덤 선택
-      const unseenClothes = data.clothes.filter(
-        (c) => !seenClothes.has(c.name)
-      );
-      const unseenFood = data.food.filter((f) => !seenFood.has(f.name));
-
-      currentClothes = unseenClothes.length
-        ? unseenClothes[Math.floor(Math.random() * unseenClothes.length)]
-        : { name: "더 이상 추천 없음", likes: 0 };
-
-      currentFood = unseenFood.length
-        ? unseenFood[Math.floor(Math.random() * unseenFood.length)]
-        : { name: "더 이상 추천 없음", likes: 0 };
-
-      if (currentClothes.name !== "더 이상 추천 없음") {
-        seenClothes.add(currentClothes.name);
-      }
-      if (currentFood.name !== "더 이상 추천 없음") {
-        seenFood.add(currentFood.name);
-      }
+      recommendRounds.add(feelingKorean);
+      currentClothes = data.clothes || { name: "더 이상 추천 없음", likes: 0 };
+      currentFood = data.food || { name: "더 이상 추천 없음", likes: 0 };
 
       renderRecommendation();
     })
@@ -617,3 +606,21 @@ function recommendEscCloser(e) {
     closeRecommendPopup();
   }
 }
+
+// 랭킹 팝업이 열려 있으면 서버 변경 알림(SSE)으로 바로 갱신
+function isRankingPopupOpen() {
+  const popup = document.getElementById("rankingPopup");
+  return popup && popup.classList.contains("show");
+}
+
+window.addEventListener("ranking-update", function (event) {
+  if (isRankingPopupOpen()) {
+    displayRanking(event.detail);
+  }
+});
+
+window.addEventListener("ranking-reset", function () {
+  if (isRankingPopupOpen()) {
+    loadRankingData();
+  }
+});
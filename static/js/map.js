@@ -4,6 +4,17 @@ let currentMapLevel = "provinces";
 let weatherData = {};
 let selectedProvince = null;
 let detailArrays = {};
+let lastWeatherStats = {};
+
+// 지도 데이터 - 빌드된 TopoJSON(레이어 x 해상도)이 있으면 사용, 없으면 원본 GeoJSON
+const MAP_ASSETS = window.MAP_ASSETS || {};
+const GEOJSON_URLS = {
+  municipalities: "/static/data/skorea-municipalities-2018-geo.json", // 시군구별 상세 지도 (약 230개 지역)
+  provinces: "/static/data/skorea-provinces-2018-geo.json", // 시도별 지도 (17개 지역)
+};
+const HIGH_DETAIL_ZOOM = 5; // n배 줌부터 상세 지도 사용
+const topologyCache = new Map(); // 파일 이름 -> TopoJSON (레벨 전환 시 다시 받지 않음)
+let currentMapResolution = null;
 
 // 동적 매핑 생성 - 지도 로드 시 자동으로 영어-한글 매핑 생성
 let regionNameMapping = {};
@@ -120,23 +131,42 @@ const path = d3.geoPath().projection(projection);
 // 툴팁
 const tooltip = d3.select("#tooltip");
 
-// GeoJSON 데이터 로드 함수
+// 줌 배율에 맞는 지도 해상도
+function mapResolutionFor(scale) {
+  if (scale < ZOOM_THRESHOLD) return "low";
+  return scale < HIGH_DETAIL_ZOOM ? "medium" : "high";
+}
+
+// 레이어(provinces/municipalities)의 GeoJSON FeatureCollection 가져오기
+async function fetchMapGeometry(layer, resolution) {
+  const file = (MAP_ASSETS[layer] || {})[resolution];
+  if (!file) {
+    const response = await fetch(GEOJSON_URLS[layer]);
+    return response.json();
+  }
+
+  let topology = topologyCache.get(file);
+  if (!topology) {
+    const response = await fetch("/map/" + file);
+    topology = await response.json();
+    topologyCache.set(file, topology);
+  }
+  // 구 통합 등에서 features를 바꾸므로 매번 새로 변환
+  return topojson.feature(topology, topology.objects[layer]);
+}
+
+// 지도 데이터 로드 함수
 async function loadKoreaMap(level = "provinces") {
   try {
     currentMapLevel = level;
-    let url;
+    const resolution =
+      level === "provinces"
+        ? "low"
+        : mapResolutionFor(d3.zoomTransform(svg.node()).k);
 
-    if (level === "municipalities") {
-      // 시군구별 상세 지도 (약 230개 지역)
-      url = "/static/data/skorea-municipalities-2018-geo.json";
-    } else {
-      // 시도별 지도 (17개 지역)
-      url = "/static/data/skorea-provinces-2018-geo.json";
-    }
-
-    console.log(`${level} 지도 데이터 로드 중...`);
-    const response = await fetch(url);
-    koreaRegions = await response.json();
+    console.log(`${level} 지도 데이터 로드 중... (${resolution})`);
+    koreaRegions = await fetchMapGeometry(level, resolution);
+    currentMapResolution = resolution;
 
     console.log(`${koreaRegions.features.length}개 지역 로드 완료`);
 
@@ -360,8 +390,11 @@ function adjustLabelPosition(d) {
 
 async function drawProvinceBoundaries() {
   try {
-    const response = await fetch("/static/data/skorea-provinces-2018-geo.json");
-    const provinceData = await response.json();
+    // 시군구 지도와 같은 해상도의 경계선
+    const provinceData = await fetchMapGeometry(
+      "provinces",
+      currentMapResolution
+    );
 
     // 시군구 지도와 동일한 투영법으로 새로 생성
     const { width, height } = getMapDimensions();
@@ -519,6 +552,7 @@ async function loadWeatherData() {
 
     detailArrays = data.detail_arrays;
     window.detailArrays = data.detail_arrays;
+    lastWeatherStats = data.weather_stats;
 
     // 지도에 날씨 데이터 적용
     applyWeatherToMap(data.weather_stats);
@@ -701,6 +735,16 @@ function checkZoomLevel(scale) {
     console.log(`줌 레벨 ${scale.toFixed(2)} - 시도별 지도로 전환`);
     autoSwitchToProvinces();
   }
+  // 시군구 지도에서 더 확대하면 상세 지도로 교체
+  else if (
+    currentMapLevel === "municipalities" &&
+    currentMapResolution !== "high" &&
+    mapResolutionFor(scale) === "high" &&
+    (MAP_ASSETS.municipalities || {}).high
+  ) {
+    console.log(`줌 레벨 ${scale.toFixed(2)} - 상세 지도로 교체`);
+    autoSwitchToMunicipalities();
+  }
 }
 
 // 시군구별 지도로 자동 전환
@@ -754,28 +798,47 @@ async function autoSwitchToProvinces() {
   }, 600); // 전환 애니메이션 완료 후
 }
 
-// 온도 데이터 업데이트 함수
+// 온도 데이터 업데이트 함수 (서버 작업 큐에 등록 후 완료될 때까지 상태 조회)
 async function updateTemperatureData() {
   try {
     console.log("온도 데이터 업데이트 요청 중...");
     const response = await fetch("/update_temperature_data", {
       method: "POST",
     });
-    const result = await response.json();
+    const job = await response.json();
+    console.log(`온도 데이터 업데이트 작업 등록됨: ${job.job_id}`);
+
+    const result = await waitForJob(job.status_url);
 
-    if (result.status === "success") {
-      console.log(result.message);
-      if (result.updated_count > 0) {
-        console.log(`${result.updated_count}개 지역 데이터 갱신됨`);
+    if (result.status === "completed") {
+      console.log(result.result.message);
+      if (result.result.updated_count > 0) {
+        console.log(`${result.result.updated_count}개 지역 데이터 갱신됨`);
       }
     } else {
-      console.error("온도 데이터 업데이트 실패:", result.message);
+      console.error("온도 데이터 업데이트 실패:", result.error);
     }
   } catch (error) {
     console.error("온도 데이터 업데이트 중 오류:", error);
   }
 }
 
+// 작업이 끝날 때까지 상태 조회 (완료/실패한 작업 정보 반환)
+async function waitForJob(statusUrl, interval = 2000) {
+  while (true) {
+    const response = await fetch(statusUrl);
+    const job = await response.json();
+
+    if (!response.ok) {
+      throw new Error(job.error);
+    }
+    if (job.status === "completed" || job.status === "failed") {
+      return job;
+    }
+    await new Promise((resolve) => setTimeout(resolve, interval));
+  }
+}
+
 // // 지도 레벨 변경 시 온도 데이터 업데이트
 // function onMapLevelChange() {
 //   updateTemperatureData();
@@ -789,10 +852,95 @@ window.addEventListener("resize", function () {
   drawMap();
 });
 
+// 서버 변경 알림(SSE)을 현재 지도 데이터에 반영
+function applyStreamDelta(delta) {
+  const MERGE_CITIES = [
+    "용인",
+    "수원",
+    "성남",
+    "청주",
+    "천안",
+    "전주",
+    "창원",
+    "안양",
+    "고양",
+    "안산",
+  ];
+  let needsReload = false;
+
+  (delta.provinces || []).forEach((p) => {
+    // 시군구 지도에서는 서울만 광역 단위로 표시
+    if (currentMapLevel === "provinces" || p.province === "서울특별시") {
+      lastWeatherStats[p.province] = p.feeling;
+    }
+  });
+
+  (delta.regions || []).forEach((r) => {
+    if (currentMapLevel === "provinces") {
+      detailArrays[r.region] = r.detailArray;
+      return;
+    }
+    if (r.province === "서울특별시") return;
+
+    // 구를 합쳐서 표시하는 시는 다른 구 데이터가 필요하므로 전체 다시 조회
+    if (MERGE_CITIES.some((city) => r.region.includes(city))) {
+      needsReload = true;
+      return;
+    }
+    lastWeatherStats[r.region] = r.feeling;
+    detailArrays[r.region] = r.detailArray;
+  });
+  window.detailArrays = detailArrays;
+
+  if (delta.ranking) {
+    window.dispatchEvent(
+      new CustomEvent("ranking-update", { detail: delta.ranking[0] })
+    );
+  }
+
+  if (needsReload) {
+    loadWeatherData();
+  } else if (delta.provinces || delta.regions) {
+    applyWeatherToMap(lastWeatherStats);
+  }
+}
+
+// 투표/온도 변경 알림 구독 (전체 데이터를 다시 받지 않고 바뀐 부분만 반영)
+// 서버 구독자가 가득 차서(503) 연결이 닫히면 브라우저가 다시 연결하지 않으므로 직접 재시도
+const STREAM_BUSY_RETRY_MS = 30000;
+
+function connectUpdateStream(reconnecting = false) {
+  if (!window.EventSource) return;
+
+  const source = new EventSource("/stream");
+  source.addEventListener("open", () => {
+    // 연결이 끊겨 있던 동안의 변경은 전체 다시 조회
+    if (reconnecting) {
+      loadWeatherData();
+      window.dispatchEvent(new CustomEvent("ranking-reset"));
+    }
+  });
+  source.addEventListener("delta", (event) => {
+    applyStreamDelta(JSON.parse(event.data));
+  });
+  // 놓친 알림이 있으면 전체 다시 조회
+  source.addEventListener("reset", () => {
+    loadWeatherData();
+    window.dispatchEvent(new CustomEvent("ranking-reset"));
+  });
+  source.addEventListener("error", () => {
+    if (source.readyState !== EventSource.CLOSED) return;
+    // 여러 탭이 동시에 다시 붙지 않도록 재시도 시각을 흩뜨림
+    const delay = STREAM_BUSY_RETRY_MS * (1 + Math.random());
+    setTimeout(() => connectUpdateStream(true), delay);
+  });
+}
+
 // 초기 지도 로드
 window.addEventListener("load", function () {
   // 시도별 지도로 시작
   loadKoreaMap("provinces");
+  connectUpdateStream();
 });
 
 // // 전역으로 노출하여 map.js에서 호출 가능하게 함
@@ -0,0 +1,77 @@
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+# 서비스 모듈은 app.py와 같이 모듈 이름으로 import
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "service"))
+sys.path.insert(0, ROOT)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+
+class StubServer:
+    """외부 API 대신 쓰는 로컬 HTTP 서버 (keep-alive 지원)
+
+    handler(request) -> (상태 코드, 본문) 또는 (상태 코드, 본문, 응답 전 지연 초)
+    request: {"path", "query"(dict), "headers", "port"(클라이언트 포트)} - requests 목록에도 기록
+    """
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                request = {
+                    "path": parts.path,
+                    "query": {key: values[0] for key, values in parse_qs(parts.query).items()},
+                    "headers": dict(self.headers),
+                    "port": self.client_address[1],
+                }
+                with stub._lock:
+                    stub.requests.append(request)
+                status, body, *delay = stub.handler(request)
+                if delay:
+                    time.sleep(delay[0])
+                body = body.encode("utf-8") if isinstance(body, str) else body
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    """stub_server(handler)로 로컬 스텁 서버 시작 (테스트가 끝나면 종료)"""
+    servers = []
+
+    def start(handler):
+        server = StubServer(handler)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
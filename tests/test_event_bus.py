@@ -0,0 +1,43 @@
+from werkzeug.wrappers import Response
+
+from event_bus import EventBus
+
+
+def test_stream_unsubscribes_when_client_disconnects():
+    bus = EventBus(window=0.01, max_subscribers=5)
+    subscription = bus.subscribe()
+    # /stream과 같이 응답 본문으로 감싸서 WSGI 서버가 연결 종료 시 하는 close() 호출
+    response = Response(bus.stream(subscription, heartbeat=0.01), mimetype="text/event-stream")
+    chunks = response.iter_encoded()
+
+    assert next(chunks) == b"retry: 3000\n\n"
+    assert next(chunks) == b": keep-alive\n\n"
+    assert bus.stats()["subscribers"] == 1
+
+    response.close()
+    assert bus.stats()["subscribers"] == 0
+
+
+def test_stream_sends_published_changes():
+    bus = EventBus(window=0.01)
+    subscription = bus.subscribe()
+    stream = bus.stream(subscription, heartbeat=1)
+    next(stream)
+
+    bus.publish("regions", ("강원도", "속초시"), {"region": "속초시", "feeling": "hot"})
+    bus.flush()
+    assert next(stream) == 'id: 1\nevent: delta\ndata: {"regions": [{"region": "속초시", "feeling": "hot"}]}\n\n'
+    stream.close()
+
+
+def test_subscribe_refuses_over_limit():
+    bus = EventBus(max_subscribers=2)
+    first, second = bus.subscribe(), bus.subscribe()
+    assert bus.subscribe() is None
+
+    # 끊긴 구독자 자리는 다시 사용
+    stream = bus.stream(first, heartbeat=1)
+    next(stream)
+    stream.close()
+    assert bus.subscribe() is not None
+    bus.unsubscribe(second)
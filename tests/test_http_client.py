@@ -0,0 +1,59 @@
+import socket
+
+import pytest
+import requests
+
+from http_client import HttpClient
+
+
+def test_reuses_keep_alive_connection(stub_server):
+    server = stub_server(lambda request: (200, "ok"))
+    client = HttpClient(pool_size=2)
+
+    for _ in range(5):
+        response = client.get(server.url + "/ping")
+        assert response.text == "ok"
+
+    assert len(server.requests) == 5
+    assert len({request["port"] for request in server.requests}) == 1
+
+
+def test_streamed_responses_return_connection_to_pool(stub_server):
+    server = stub_server(lambda request: (200, "line 1\nline 2\n"))
+    client = HttpClient(pool_size=1)
+
+    for _ in range(3):
+        with client.get(server.url, stream=True) as response:
+            assert list(response.iter_lines()) == [b"line 1", b"line 2"]
+
+    assert len({request["port"] for request in server.requests}) == 1
+
+
+def test_records_stats_per_host(stub_server):
+    ok = stub_server(lambda request: (200, "ok"))
+    failing = stub_server(lambda request: (503, "unavailable"))
+    client = HttpClient(max_retries=0)
+
+    client.get(ok.url)
+    client.get(ok.url)
+    client.get(failing.url)
+
+    stats = client.stats()
+    ok_host, failing_host = ok.url.split("//")[1], failing.url.split("//")[1]
+    assert stats[ok_host]["requests"] == 2 and stats[ok_host]["errors"] == 0
+    assert stats[failing_host]["requests"] == 1 and stats[failing_host]["errors"] == 1
+    assert stats[ok_host]["max_ms"] >= stats[ok_host]["avg_ms"] >= 0
+
+
+def test_connection_errors_are_recorded():
+    # 아무도 듣지 않는 포트
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    client = HttpClient(max_retries=1, timeout=1)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get(f"http://127.0.0.1:{port}/")
+
+    stats = client.stats()[f"127.0.0.1:{port}"]
+    assert stats["requests"] == 1 and stats["errors"] == 1
@@ -0,0 +1,85 @@
+import datetime
+import threading
+
+import pytest
+
+from job_queue import COMPLETED, FAILED, QUEUED, RUNNING, JobQueue
+
+mongomock = pytest.importorskip("mongomock")
+
+
+@pytest.fixture
+def db():
+    db = mongomock.MongoClient().korea_regions_db
+    JobQueue(db).ensure_indexes()
+    return db
+
+
+def make_queue(db, handler):
+    queue = JobQueue(db, max_workers=2)
+    queue.register("update", handler)
+    return queue
+
+
+def wait_finished(queue, job_id):
+    queue._executor.shutdown(wait=True)
+    return queue.get(job_id)
+
+
+def test_processes_share_one_active_job(db):
+    release = threading.Event()
+    calls = []
+
+    def handler(**params):
+        calls.append(params)
+        release.wait(5)
+        return {"ok": True}
+
+    # 같은 DB를 쓰는 두 프로세스의 작업 큐
+    first, second = make_queue(db, handler), make_queue(db, handler)
+    job_id = first.enqueue("update", province="서울특별시", region="강남구")
+
+    assert second.enqueue("update", region="강남구", province="서울특별시") == job_id
+    assert first.enqueue("update", province="서울특별시", region="강남구") == job_id
+    assert second.enqueue("update", province="부산광역시", region="중구") != job_id
+    assert first.get(job_id)["status"] in (QUEUED, RUNNING)
+
+    release.set()
+    assert wait_finished(first, job_id)["status"] == COMPLETED
+    wait_finished(second, None)
+    assert calls.count({"province": "서울특별시", "region": "강남구"}) == 1
+
+
+def test_finished_job_allows_new_job(db):
+    queue = make_queue(db, lambda: {"ok": True})
+    job_id = queue.enqueue("update")
+    assert wait_finished(queue, job_id)["status"] == COMPLETED
+    assert "active_key" not in queue.get(job_id)
+
+    queue = make_queue(db, lambda: {"ok": True})
+    assert queue.enqueue("update") != job_id
+
+
+def test_stale_job_is_replaced(db):
+    queue = make_queue(db, lambda: {"ok": True})
+    # 실행하던 프로세스가 죽어서 끝나지 않은 작업
+    db.jobs.insert_one({"_id": "dead", "type": "update", "params": {}, "status": RUNNING,
+                        "active_key": "update:{}",
+                        "created_at": datetime.datetime.now() - queue.stale_after * 2})
+
+    job_id = queue.enqueue("update")
+
+    assert job_id != "dead"
+    dead = queue.get("dead")
+    assert dead["status"] == FAILED and "active_key" not in dead
+    assert wait_finished(queue, job_id)["status"] == COMPLETED
+
+
+def test_unique_index_rejects_second_active_job(db):
+    from pymongo.errors import DuplicateKeyError
+
+    db.jobs.insert_one({"_id": "a", "active_key": "update:{}"})
+    with pytest.raises(DuplicateKeyError):
+        db.jobs.insert_one({"_id": "b", "active_key": "update:{}"})
+    # 끝난 작업(active_key 없음)은 여러 개 가능
+    db.jobs.insert_many([{"_id": "c"}, {"_id": "d"}])
@@ -0,0 +1,151 @@
+import os
+import time
+
+import pytest
+import requests
+
+from http_client import HttpClient
+from kma_fetcher import KmaFetcher, TokenBucket, parse_aws_lines
+from conftest import DATA_DIR
+
+
+def aws_line(code, temp):
+    """nph-aws2_min 응답 한 줄 (기온은 9번째 컬럼)"""
+    return f"202510181500 {code:>4}  266.8   2.9 267.2   4.5 268.1   2.8 {temp:>5}   0   0.0   0.0\n"
+
+
+def make_fetcher(server, **kwargs):
+    options = dict(base_url=server.url, max_retries=3, backoff=0.01, rate=1000, timeout=1,
+                   http=HttpClient(max_retries=0))
+    options.update(kwargs)
+    return KmaFetcher("test-key", **options)
+
+
+def test_retries_server_errors_then_succeeds(stub_server):
+    statuses = iter([500, 429, 200])
+    server = stub_server(lambda request: (next(statuses), aws_line(108, "12.3")))
+
+    assert make_fetcher(server).fetch_temperature(108) == 12.3
+    assert len(server.requests) == 3
+    assert server.requests[0]["query"] == {"tm2": "0", "stn": "108", "disp": "0",
+                                           "authKey": "test-key", "inf": "AWS"}
+
+
+def test_client_errors_are_not_retried(stub_server):
+    server = stub_server(lambda request: (400, "bad request"))
+
+    assert make_fetcher(server).fetch_temperature(108) is None
+    assert len(server.requests) == 1
+
+
+def test_gives_up_after_max_retries(stub_server):
+    server = stub_server(lambda request: (503, "unavailable"))
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        make_fetcher(server, max_retries=2).fetch_temperature(108)
+    assert len(server.requests) == 3
+
+
+def test_timeouts_are_retried(stub_server):
+    delays = iter([0.5, 0])
+    server = stub_server(lambda request: (200, aws_line(108, "7.5"), next(delays)))
+
+    assert make_fetcher(server, timeout=0.2).fetch_temperature(108) == 7.5
+    assert len(server.requests) == 2
+
+
+def test_fetch_many_reports_failed_stations(stub_server):
+    def handler(request):
+        code = int(request["query"]["stn"])
+        if code == 999:
+            return 500, "error"
+        return 200, aws_line(code, f"{code / 10:.1f}")
+
+    server = stub_server(handler)
+    results, errors = make_fetcher(server, max_retries=1).fetch_many({"a": 108, "b": 119, "c": 999})
+
+    assert results == {"a": 10.8, "b": 11.9}
+    assert list(errors) == ["c"]
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=20, capacity=2)
+    started = time.monotonic()
+    for _ in range(8):
+        bucket.acquire()
+    # 처음 2개는 바로, 나머지 6개는 초당 20개 속도로
+    assert time.monotonic() - started >= 6 / 20 - 0.02
+
+
+def test_requests_respect_rate_limit(stub_server):
+    server = stub_server(lambda request: (200, aws_line(int(request["query"]["stn"]), "1.0")))
+    fetcher = make_fetcher(server, rate=20, max_workers=8)
+    fetcher.rate_limiter = TokenBucket(rate=20, capacity=1)
+
+    started = time.monotonic()
+    results, errors = fetcher.fetch_many({code: code for code in range(100, 110)})
+
+    assert len(results) == 10 and not errors
+    assert time.monotonic() - started >= 9 / 20 - 0.02
+
+
+def recorded_stn0():
+    with open(os.path.join(DATA_DIR, "kma_aws2_min_stn0.txt"), encoding="ascii") as f:
+        return f.read()
+
+
+def test_parse_aws_lines_reads_recorded_response():
+    temps = dict(parse_aws_lines(recorded_stn0().encode("ascii").splitlines()))
+
+    # 주석 줄은 건너뛰고, 결측값(-99.0)은 자료 없음
+    assert temps == {90: 16.9, 98: 18.4, 108: 19.6, 112: 18.1, 119: 20.3,
+                     133: 21.0, 159: 22.7, 184: 21.8}
+    assert dict(parse_aws_lines(recorded_stn0().splitlines(), {108, 184, 999})) == {108: 19.6, 184: 21.8}
+
+
+def test_fetch_stations_uses_one_batch_request(stub_server):
+    server = stub_server(lambda request: (200, recorded_stn0()))
+    fetcher = make_fetcher(server, mode="batch")
+    fetcher.batch_min_stations = 2
+
+    temps, errors = fetcher.fetch_stations([108, 119, 159])
+
+    assert temps == {108: 19.6, 119: 20.3, 159: 22.7}
+    assert errors == {}
+    assert [request["query"]["stn"] for request in server.requests] == ["0"]
+
+
+def test_fetch_stations_refetches_missing_stations(stub_server):
+    def handler(request):
+        code = request["query"]["stn"]
+        if code == "0":
+            return 200, recorded_stn0()
+        if code == "201":
+            return 200, aws_line(201, "15.2")
+        return 200, "#START7777\n#7777END\n"
+
+    server = stub_server(handler)
+    fetcher = make_fetcher(server, mode="batch")
+    fetcher.batch_min_stations = 2
+
+    temps, errors = fetcher.fetch_stations([108, 143, 201])
+
+    assert temps == {108: 19.6, 201: 15.2}
+    assert errors == {143: "기온 자료 없음"}
+    assert sorted(request["query"]["stn"] for request in server.requests) == ["0", "143", "201"]
+
+
+def test_fetch_stations_falls_back_when_batch_fails(stub_server):
+    def handler(request):
+        if request["query"]["stn"] == "0":
+            return 500, "error"
+        return 200, aws_line(int(request["query"]["stn"]), "9.9")
+
+    server = stub_server(handler)
+    fetcher = make_fetcher(server, mode="batch", max_retries=0)
+    fetcher.batch_min_stations = 2
+
+    temps, errors = fetcher.fetch_stations([108, 119])
+
+    assert temps == {108: 9.9, 119: 9.9}
+    assert errors == {}
@@ -0,0 +1,86 @@
+import json
+import threading
+import time
+
+from http_client import HttpClient
+from location_service import GEO_PATH, LocationService, make_signature
+
+
+def geo_response(request):
+    """요청 IP의 셋째 자리로 시군구를 정하는 스텁 응답"""
+    district = "강남구" if request["query"]["ip"].split(".")[2] == "1" else "해운대구"
+    province = "서울특별시" if district == "강남구" else "부산광역시"
+    body = {"returnCode": 0, "geoLocation": {"country": "KR", "r1": province, "r2": f"{district} 역삼동"}}
+    return 200, json.dumps(body, ensure_ascii=False)
+
+
+def make_service(server, **kwargs):
+    return LocationService("access", "secret", base_url=server.url, http=HttpClient(), **kwargs)
+
+
+def test_signs_request(stub_server):
+    server = stub_server(geo_response)
+
+    assert make_service(server).lookup("10.0.1.5") == ("서울특별시", "강남구")
+
+    request = server.requests[0]
+    assert request["path"] == GEO_PATH
+    assert request["query"]["ip"] == "10.0.1.5"
+    basestring = f"{GEO_PATH}?ip=10.0.1.5&ext=t&enc=utf-8&responseFormatType=json"
+    timestamp = request["headers"]["x-ncp-apigw-timestamp"]
+    assert request["headers"]["x-ncp-apigw-signature-v2"] == make_signature(
+        "GET", basestring, timestamp, "access", "secret")
+
+
+def test_caches_by_ip_prefix(stub_server):
+    server = stub_server(geo_response)
+    service = make_service(server)
+
+    assert service.lookup("10.0.1.5") == ("서울특별시", "강남구")
+    assert service.lookup("10.0.1.200") == ("서울특별시", "강남구")
+    assert service.lookup("10.0.2.7") == ("부산광역시", "해운대구")
+
+    assert [request["query"]["ip"] for request in server.requests] == ["10.0.1.5", "10.0.2.7"]
+    stats = service.stats()
+    assert stats["size"] == 2 and stats["hits"] == 1 and stats["misses"] == 2
+
+
+def test_concurrent_lookups_share_one_upstream_call(stub_server):
+    server = stub_server(lambda request: (*geo_response(request), 0.2))
+    service = make_service(server)
+    results = []
+
+    threads = [threading.Thread(target=lambda i=i: results.append(service.lookup(f"10.0.1.{i}")))
+               for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [("서울특별시", "강남구")] * 8
+    assert len(server.requests) == 1
+
+
+def test_serves_stale_result_while_refreshing(stub_server):
+    server = stub_server(geo_response)
+    service = make_service(server, ttl=0.05)
+
+    service.lookup("10.0.1.5")
+    time.sleep(0.1)
+
+    # 만료된 결과를 바로 돌려주고 백그라운드에서 한 번 갱신
+    assert service.lookup("10.0.1.6") == ("서울특별시", "강남구")
+    deadline = time.monotonic() + 2
+    while len(server.requests) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(server.requests) == 2
+
+
+def test_lookup_wait_returns_none_then_caches_late_result(stub_server):
+    server = stub_server(lambda request: (*geo_response(request), 0.3))
+    service = make_service(server)
+
+    assert service.lookup("10.0.1.5", wait=0.05) is None
+    time.sleep(0.5)
+    assert service.lookup("10.0.1.5", wait=0.05) == ("서울특별시", "강남구")
+    assert len(server.requests) == 1
@@ -0,0 +1,35 @@
+import datetime
+
+import pytest
+
+from vote_history import VoteHistory, bucket_hour
+
+mongomock = pytest.importorskip("mongomock")
+
+UTC = datetime.timezone.utc
+KST = datetime.timezone(datetime.timedelta(hours=9))
+
+
+def test_bucket_hour_is_utc():
+    when = datetime.datetime(2025, 10, 18, 15, 42, 7, tzinfo=KST)
+    assert bucket_hour(when) == datetime.datetime(2025, 10, 18, 6, tzinfo=UTC)
+
+    now = datetime.datetime.now(UTC)
+    assert bucket_hour() in (now.replace(minute=0, second=0, microsecond=0),
+                             (now + datetime.timedelta(hours=1)).replace(minute=0, second=0, microsecond=0))
+
+
+def test_records_votes_in_utc_buckets():
+    history = VoteHistory(mongomock.MongoClient().db)
+    when = datetime.datetime(2025, 10, 18, 0, 30, tzinfo=KST)
+
+    history.record("서울특별시", "강남구", "hot", 2, when=when)
+    history.record("서울특별시", "강남구", "hot", 3, when=when)
+    history.record("부산광역시", "중구", "cold", 1, when=when)
+
+    buckets = {(doc["province"], doc["name"]): doc for doc in history.collection.find()}
+    # KST 10월 18일 0시대 = UTC 10월 17일 15시
+    assert {doc["hour"] for doc in buckets.values()} == {datetime.datetime(2025, 10, 17, 15)}
+    assert buckets[("서울특별시", "강남구")]["hot_0"] == 2
+    assert buckets[("서울특별시", "강남구")]["hot_3"] == 1
+    assert buckets[("부산광역시", "중구")]["cold_1"] == 1
@@ -0,0 +1,137 @@
+"""/get_weather_data 집계 파이프라인($group/$facet) 결과를 기존 Python 합산 방식과 비교"""
+import random
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+from data_service import DataService
+from region_store import PROVINCES
+
+MERGE_CITIES = ['용인', '수원', '성남', '청주', '천안', '전주', "창원", "안양", "고양", "안산"]
+
+
+def _fixture_regions(seed=7):
+    """광역시/도마다 시군구 몇 개 (투표 없음/동점/통합 대상 구 포함)"""
+    rng = random.Random(seed)
+    regions = []
+    for province in PROVINCES:
+        names = [f"{province[:2]}{i}구" for i in range(4)]
+        if province == "경기도":
+            names += ["수원시 장안구", "수원시 영통구", "용인시 수지구"]
+        for name in names:
+            arrays = {}
+            for feeling in ("hot", "normal", "cold"):
+                details = [rng.choice([0, 0, 1, 2, 5]) for _ in range(5)]
+                arrays[feeling] = [sum(details)] + details
+            regions.append({"province": province, "name": name, "code": 0, **arrays})
+    # 모든 feeling이 같은 동점 시군구, 배열이 없는 시군구
+    regions.append({"province": "강원도", "name": "동점군", "hot": [3, 3, 0, 0, 0, 0],
+                    "normal": [3, 3, 0, 0, 0, 0], "cold": [3, 3, 0, 0, 0, 0]})
+    regions.append({"province": "강원도", "name": "빈군"})
+    return regions
+
+
+# 기존 구현 (광역시/도별 컬렉션을 하나씩 읽어 Python에서 합산)
+def _dominant(doc):
+    hot, normal, cold = (doc.get(f, [0, 0, 0, 0, 0, 0]) for f in ("hot", "normal", "cold"))
+    max_votes = max(hot[0], normal[0], cold[0])
+    if hot[0] == max_votes:
+        return "hot", hot
+    if cold[0] == max_votes:
+        return "cold", cold
+    return "normal", normal
+
+
+def _totals(doc):
+    return {f: doc.get(f, [0])[0] for f in ("hot", "normal", "cold")}
+
+
+def _feeling_from_totals(totals):
+    max_value = max(totals.values())
+    if max_value > 0:
+        if totals["hot"] == max_value:
+            return "hot"
+        if totals["cold"] == max_value:
+            return "cold"
+    return "normal"
+
+
+def _merge_city_data(weather_stats, detail_arrays):
+    def city_of(name):
+        for city in MERGE_CITIES:
+            if city in name:
+                return city + "시"
+        return name
+
+    city_votes, city_details = {}, {}
+    for name, feeling in weather_stats.items():
+        city = city_of(name)
+        if city not in city_votes:
+            city_votes[city] = {"hot": 0, "normal": 0, "cold": 0}
+            city_details[city] = [0, 0, 0, 0, 0, 0]
+        city_votes[city][feeling] += 1
+        if name in detail_arrays:
+            detail = detail_arrays[name]
+            for i in range(4):
+                city_details[city][i] += detail[i] if i < len(detail) else 0
+
+    merged_weather, merged_arrays = {}, {}
+    for city, votes in city_votes.items():
+        merged_weather[city] = max(votes, key=votes.get)
+        merged_arrays[city] = city_details[city]
+    return merged_weather, merged_arrays
+
+
+def _python_weather_data(level, regions):
+    by_province = {province: [doc for doc in regions if doc["province"] == province] for province in PROVINCES}
+    weather_stats, array = {}, {}
+    if level == "provinces":
+        for province, docs in by_province.items():
+            totals = {"hot": 0, "normal": 0, "cold": 0}
+            for doc in docs:
+                for feeling, count in _totals(doc).items():
+                    totals[feeling] += count
+                if max(_totals(doc).values()) > 0:
+                    array[doc["name"]] = _dominant(doc)[1]
+            weather_stats[province] = _feeling_from_totals(totals)
+        return weather_stats, array
+
+    for province, docs in by_province.items():
+        if province == "서울특별시":
+            totals = {"hot": 0, "normal": 0, "cold": 0}
+            for doc in docs:
+                for feeling, count in _totals(doc).items():
+                    totals[feeling] += count
+            weather_stats[province] = _feeling_from_totals(totals)
+            array[province] = [sum(totals.values()), 0, 0, 0] if max(totals.values()) > 0 else [0, 0, 0, 0, 0, 0]
+            continue
+        for doc in docs:
+            if sum(_totals(doc).values()) > 0:
+                weather_stats[doc["name"]], array[doc["name"]] = _dominant(doc)
+            else:
+                weather_stats[doc["name"]], array[doc["name"]] = "normal", []
+    return _merge_city_data(weather_stats, array)
+
+
+@pytest.fixture
+def data_service():
+    client = mongomock.MongoClient()
+    regions = _fixture_regions()
+    client.korea_regions_db.regions.insert_many([dict(doc) for doc in regions])
+    return DataService(client), regions
+
+
+@pytest.mark.parametrize("level", ["provinces", "municipalities"])
+def test_pipeline_matches_python_merge(data_service, level):
+    service, regions = data_service
+    assert service._load_weather_data(level) == _python_weather_data(level, regions)
+
+
+def test_pipeline_without_votes(data_service):
+    service, regions = data_service
+    service.db.regions.update_many({}, {"$set": {f: [0] * 6 for f in ("hot", "normal", "cold")}})
+    for doc in regions:
+        doc.update({f: [0] * 6 for f in ("hot", "normal", "cold")})
+    for level in ("provinces", "municipalities"):
+        assert service._load_weather_data(level) == _python_weather_data(level, regions)